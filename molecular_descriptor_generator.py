@@ -12,210 +12,32 @@
 
 # Librerías principales para química computacional
 from rdkit import rdBase, Chem
-from rdkit.Chem import AllChem, Draw
+from rdkit.Chem import AllChem, Draw, rdMolDescriptors
 from rdkit.Chem.Draw import IPythonConsole
 
 # Librerías para manipulación de datos y cálculos
 import sys, py3Dmol
+import argparse, functools, gzip, hashlib, importlib.util, io, itertools, json, multiprocessing, os
+import multiprocessing.connection, sqlite3, time, warnings
 import pandas as pd
 import numpy as np
 import math
 
 # Librería para cálculo de descriptores moleculares
+import mordred
 from mordred import Calculator, descriptors
+from mordred._atomic_property import AtomicProperty, vdw_radii
+from mordred.surface_area._mesh import SphereMesh
 
 # Librería para visualización
 import matplotlib.pyplot as plt
 
 # ----------------------------------------------------------------------------
-# CARGA Y PREPARACIÓN DE DATOS MOLECULARES
+# DESCRIPTORES 3D DE INTERÉS
 # ----------------------------------------------------------------------------
 
-# Cargar dataset con estructuras moleculares desde archivo Excel
-print("Cargando dataset molecular...")
-df_original = pd.DataFrame(pd.read_excel('DATA.xlsx'))
-lista_smiles = df_original["SMILES"]
-
-print(f"Dataset cargado: {len(lista_smiles)} moléculas encontradas")
-
-# Convertir notaciones SMILES a objetos moleculares de RDKit
-moleculas_base = [Chem.MolFromSmiles(smile) for smile in lista_smiles]
-moleculas_para_conformaciones = moleculas_base
-
-# ----------------------------------------------------------------------------
-# DEFINICIÓN DE FUNCIONES PARA GENERACIÓN DE CONFORMACIONES 3D
-# ----------------------------------------------------------------------------
-
-def generar_conformacion_uff(lista_moleculas):
-    """
-    Genera conformaciones 3D utilizando el campo de fuerza UFF (Universal Force Field)
-    
-    Args:
-        lista_moleculas: Lista de objetos moleculares RDKit
-        
-    Returns:
-        Lista de moléculas optimizadas con UFF
-    """
-    print("Generando conformaciones con campo de fuerza UFF...")
-    moleculas_uff = []
-    
-    for molecula in lista_moleculas:
-        # Añadir hidrógenos explícitos a la molécula
-        mol_con_hidrogenos = Chem.AddHs(molecula)
-        
-        # Generar geometría 3D inicial sin conocimiento previo
-        AllChem.EmbedMolecule(mol_con_hidrogenos, 
-                            useBasicKnowledge=False, 
-                            useExpTorsionAnglePrefs=False)
-        
-        # Verificar si UFF puede manejar todos los parámetros de la molécula
-        if AllChem.UFFHasAllMoleculeParams(mol_con_hidrogenos):
-            # Optimizar geometría con campo de fuerza UFF
-            AllChem.UFFOptimizeMolecule(mol_con_hidrogenos)
-            moleculas_uff.append(mol_con_hidrogenos)
-    
-    print(f"Conformaciones UFF generadas: {len(moleculas_uff)}")
-    return moleculas_uff
-
-def generar_conformacion_mmff(lista_moleculas):
-    """
-    Genera conformaciones 3D utilizando el campo de fuerza MMFF (Merck Molecular Force Field)
-    
-    Args:
-        lista_moleculas: Lista de objetos moleculares RDKit
-        
-    Returns:
-        Lista de moléculas optimizadas con MMFF
-    """
-    print("Generando conformaciones con campo de fuerza MMFF...")
-    moleculas_mmff = []
-    
-    for molecula in lista_moleculas:
-        # Añadir hidrógenos explícitos
-        mol_con_hidrogenos = Chem.AddHs(molecula)
-        
-        # Generar geometría 3D inicial
-        AllChem.EmbedMolecule(mol_con_hidrogenos, 
-                            useBasicKnowledge=False, 
-                            useExpTorsionAnglePrefs=False)
-        
-        # Verificar compatibilidad con MMFF
-        if AllChem.MMFFHasAllMoleculeParams(mol_con_hidrogenos):
-            # Optimizar con MMFF
-            AllChem.MMFFOptimizeMolecule(mol_con_hidrogenos)
-            moleculas_mmff.append(mol_con_hidrogenos)
-    
-    print(f"Conformaciones MMFF generadas: {len(moleculas_mmff)}")
-    return moleculas_mmff
-
-def generar_conformacion_etdg(lista_moleculas):
-    """
-    Genera conformaciones usando ETDG (Experimental-Torsion-angle preference with 
-    Distance Geometry)
-    
-    Args:
-        lista_moleculas: Lista de objetos moleculares RDKit
-        
-    Returns:
-        Lista de moléculas con conformaciones ETDG
-    """
-    print("Generando conformaciones con método ETDG...")
-    moleculas_etdg = []
-    
-    for molecula in lista_moleculas:
-        mol_con_hidrogenos = Chem.AddHs(molecula)
-        # Usar parámetros ETDG para geometría más realista
-        AllChem.EmbedMolecule(mol_con_hidrogenos, AllChem.ETDG())
-        moleculas_etdg.append(mol_con_hidrogenos)
-    
-    print(f"Conformaciones ETDG generadas: {len(moleculas_etdg)}")
-    return moleculas_etdg
-
-def generar_conformacion_kdg(lista_moleculas):
-    """
-    Genera conformaciones usando KDG (Knowledge-based Distance Geometry)
-    
-    Args:
-        lista_moleculas: Lista de objetos moleculares RDKit
-        
-    Returns:
-        Lista de moléculas con conformaciones KDG
-    """
-    print("Generando conformaciones con método KDG...")
-    moleculas_kdg = []
-    
-    for molecula in lista_moleculas:
-        mol_con_hidrogenos = Chem.AddHs(molecula)
-        # Aplicar método KDG
-        AllChem.EmbedMolecule(mol_con_hidrogenos, AllChem.KDG())
-        moleculas_kdg.append(mol_con_hidrogenos)
-    
-    print(f"Conformaciones KDG generadas: {len(moleculas_kdg)}")
-    return moleculas_kdg
-
-def generar_conformacion_etkdg(lista_moleculas, version=1):
-    """
-    Genera conformaciones usando ETKDG (Experimental-Torsion-angle preference with 
-    Knowledge-based Distance Geometry)
-    
-    Args:
-        lista_moleculas: Lista de objetos moleculares RDKit
-        version: Versión del algoritmo (1 o 2)
-        
-    Returns:
-        Lista de moléculas con conformaciones ETKDG
-    """
-    print(f"Generando conformaciones con método ETKDGv{version}...")
-    moleculas_etkdg = []
-    
-    for molecula in lista_moleculas:
-        mol_con_hidrogenos = Chem.AddHs(molecula)
-        
-        # Seleccionar versión del algoritmo
-        if version == 1:
-            parametros = AllChem.ETKDG()
-        elif version == 2:
-            parametros = AllChem.ETKDGv2()
-        else:
-            print('Versión inválida. Use 1 o 2.')
-            return None
-            
-        AllChem.EmbedMolecule(mol_con_hidrogenos, parametros)
-        moleculas_etkdg.append(mol_con_hidrogenos)
-    
-    print(f"Conformaciones ETKDGv{version} generadas: {len(moleculas_etkdg)}")
-    return moleculas_etkdg
-
-# ----------------------------------------------------------------------------
-# GENERACIÓN DE CONFORMACIONES CON DIFERENTES MÉTODOS
-# ----------------------------------------------------------------------------
-
-print("\n=== INICIANDO GENERACIÓN DE CONFORMACIONES ===")
-
-# Generar conformaciones con cada método
-conformaciones_uff = generar_conformacion_uff(moleculas_para_conformaciones)
-conformaciones_etdg = generar_conformacion_etdg(moleculas_para_conformaciones)
-conformaciones_etkdgv1 = generar_conformacion_etkdg(moleculas_para_conformaciones, version=1)
-conformaciones_etkdgv2 = generar_conformacion_etkdg(moleculas_para_conformaciones, version=2)
-
-# ----------------------------------------------------------------------------
-# CONFIGURACIÓN DEL CALCULADOR DE DESCRIPTORES
-# ----------------------------------------------------------------------------
-
-# Definir número de iteraciones para análisis estadístico
-numero_iteraciones = 50
-lista_iteraciones = list(range(numero_iteraciones))
-indices_moleculas = list(range(len(conformaciones_uff)))
-
-print(f"\nConfiguración del análisis:")
-print(f"- Número de iteraciones: {numero_iteraciones}")
-print(f"- Número de moléculas: {len(conformaciones_uff)}")
-
-# Crear calculador temporal para filtrar descriptores
-calculador_temporal = Calculator(descriptors, ignore_3D=False)
-
 # Lista específica de descriptores 3D de interés
-nombres_descriptores_3d = [
+NOMBRES_DESCRIPTORES_3D = [
     # Descriptores de superficie molecular polar/no polar
     "PNSA1","PNSA2","PNSA3","PNSA4","PNSA5",  # Superficie polar negativa
     "PPSA1","PPSA2","PPSA3","PPSA4","PPSA5",  # Superficie polar positiva
@@ -268,205 +90,3247 @@ nombres_descriptores_3d = [
     "MOMI-X","MOMI-Y","MOMI-Z","PBF"
 ]
 
-print(f"- Descriptores 3D seleccionados: {len(nombres_descriptores_3d)}")
+# ----------------------------------------------------------------------------
+# PREPARACIÓN DE MOLÉCULAS (UNA VEZ POR MOLÉCULA DE ENTRADA)
+# ----------------------------------------------------------------------------
+
+class PropiedadesAtomicas:
+    """
+    Propiedades por átomo de una molécula con hidrógenos explícitos, comunes a
+    todas sus conformaciones
+
+    Attributes:
+        numeros_atomicos: Número atómico de cada átomo
+        masas: Masa atómica de cada átomo
+        cargas_gasteiger: Carga de Gasteiger de cada átomo (se calcula la
+            primera vez que se pide)
+    """
+
+    def __init__(self, mol_con_hidrogenos):
+        self.molecula = mol_con_hidrogenos
+        atomos = mol_con_hidrogenos.GetAtoms()
+        self.numeros_atomicos = np.array([atomo.GetAtomicNum() for atomo in atomos])
+        self.masas = np.array([atomo.GetMass() for atomo in atomos])
+
+    @functools.cached_property
+    def cargas_gasteiger(self):
+        """Cargas de Gasteiger (incluidos los hidrógenos implícitos), como en Mordred"""
+        molecula = Chem.Mol(self.molecula, quickCopy=True)
+        AllChem.ComputeGasteigerCharges(molecula)
+        return np.array([atomo.GetDoubleProp("_GasteigerCharge")
+                         + atomo.GetDoubleProp("_GasteigerHCharge")
+                         for atomo in molecula.GetAtoms()])
+
+class MoleculaPreparada:
+    """
+    Datos de una molécula que no dependen de la conformación, calculados una
+    sola vez y reutilizados por todos los métodos e iteraciones
+
+    Attributes:
+        mol_con_hidrogenos: Molécula con hidrógenos explícitos (sin conformaciones)
+        tiene_parametros_uff: Si UFF dispone de parámetros para la molécula
+        propiedades_mmff: Objeto MMFFMolProperties, o None si MMFF no tiene parámetros
+        propiedades_atomicas: PropiedadesAtomicas de la molécula con hidrógenos,
+            compartidas por los descriptores 3D nativos de todos los métodos
+        smiles_canonico: SMILES canónico, identidad de la molécula para las semillas
+    """
+
+    def __init__(self, molecula):
+        self.smiles_canonico = Chem.MolToSmiles(molecula)
+
+        # Añadir hidrógenos explícitos una única vez
+        self.mol_con_hidrogenos = Chem.AddHs(molecula)
 
-# Filtrar descriptores disponibles
-descriptores_filtrados = []
-for i, descriptor in enumerate(calculador_temporal.descriptors):
-    if descriptor.__str__() in nombres_descriptores_3d:
-       descriptores_filtrados.append(descriptor)
+        # Disponibilidad de parámetros de los campos de fuerza
+        self.tiene_parametros_uff = AllChem.UFFHasAllMoleculeParams(self.mol_con_hidrogenos)
+        self.propiedades_mmff = AllChem.MMFFGetMoleculeProperties(self.mol_con_hidrogenos)
 
-# Crear calculador final con descriptores filtrados
-calculador_3d = Calculator(descriptores_filtrados, ignore_3D=False)
+        # Propiedades atómicas por átomo
+        self.propiedades_atomicas = PropiedadesAtomicas(self.mol_con_hidrogenos)
 
-print(f"- Descriptores disponibles para cálculo: {len(descriptores_filtrados)}")
+    @property
+    def tiene_parametros_mmff(self):
+        return self.propiedades_mmff is not None
+
+    def nueva_molecula(self):
+        """
+        Devuelve una copia de la molécula con hidrógenos lista para embeber
+        """
+        return Chem.Mol(self.mol_con_hidrogenos)
 
 # ----------------------------------------------------------------------------
-# CÁLCULO DE DESCRIPTORES PARA CADA ITERACIÓN Y MÉTODO
+# MOTOR DE CONFORMACIONES MÚLTIPLES POR MOLÉCULA
 # ----------------------------------------------------------------------------
 
-print("\n=== INICIANDO CÁLCULO DE DESCRIPTORES ===")
+# Métodos de conformación y sufijo de sus columnas en los resultados
+METODOS_CONFORMACION = [
+    ("ETKDGv2", ""),
+    ("ETKDGv1", "_ETKDG"),
+    ("ETDG", "_ETDG"),
+    ("KDG", "_KDG"),
+    ("DGuff", "_DGuff"),
+    ("DGmmff", "_DGmmff"),
+]
 
-# Diccionario para almacenar resultados de cada iteración
-resultados_descriptores = {}
+# Métodos que parten del mismo embebido DG y se optimizan con un campo de fuerza
+METODOS_CAMPO_FUERZA = ("DGuff", "DGmmff")
 
-# Calcular descriptores para cada iteración
-for iteracion in lista_iteraciones:
-    print(f"Procesando iteración {iteracion + 1}/{numero_iteraciones}...")
-    
-    # ETKDGv2 como método base
-    df_etkdgv2 = pd.DataFrame(calculador_3d.pandas(generar_conformacion_etkdg(moleculas_para_conformaciones, 2)))
-    resultados_descriptores[iteracion] = df_etkdgv2
-    
-    # Añadir resultados de ETKDGv1
-    df_etkdgv1 = pd.DataFrame(calculador_3d.pandas(generar_conformacion_etkdg(moleculas_para_conformaciones, 1)))
-    resultados_descriptores[iteracion] = pd.concat([resultados_descriptores[iteracion], 
-                                                   df_etkdgv1.add_suffix("_ETKDG")], axis=1)
-    
-    # Añadir resultados de ETDG
-    df_etdg = pd.DataFrame(calculador_3d.pandas(generar_conformacion_etdg(moleculas_para_conformaciones)))
-    resultados_descriptores[iteracion] = pd.concat([resultados_descriptores[iteracion], 
-                                                   df_etdg.add_suffix("_ETDG")], axis=1)
-    
-    # Añadir resultados de KDG
-    df_kdg = pd.DataFrame(calculador_3d.pandas(generar_conformacion_kdg(moleculas_para_conformaciones)))
-    resultados_descriptores[iteracion] = pd.concat([resultados_descriptores[iteracion], 
-                                                   df_kdg.add_suffix("_KDG")], axis=1)
-    
-    # Añadir resultados de UFF
-    df_uff = pd.DataFrame(calculador_3d.pandas(generar_conformacion_uff(moleculas_para_conformaciones)))
-    resultados_descriptores[iteracion] = pd.concat([resultados_descriptores[iteracion], 
-                                                   df_uff.add_suffix("_DGuff")], axis=1)
-    
-    # Añadir resultados de MMFF
-    df_mmff = pd.DataFrame(calculador_3d.pandas(generar_conformacion_mmff(moleculas_para_conformaciones)))
-    resultados_descriptores[iteracion] = pd.concat([resultados_descriptores[iteracion], 
-                                                   df_mmff.add_suffix("_DGmmff")], axis=1)
+# Semilla de embebido por defecto de RDKit (aleatoria en cada llamada)
+SEMILLA_ALEATORIA = -1
+
+# Semilla maestra por defecto de la ejecución
+SEMILLA_MAESTRA = 42
+
+def semilla_unidad(semilla_maestra, smiles, metodo):
+    """
+    Deriva la semilla de embebido de una unidad (molécula, método) a partir de
+    la semilla maestra. Sólo depende del SMILES canónico y del método, por lo
+    que el resultado no cambia con el número de procesos, los bloques o el
+    orden de ejecución
+
+    Args:
+        semilla_maestra: Semilla de la ejecución (SEMILLA_ALEATORIA para no fijarla)
+        smiles: SMILES canónico de la molécula
+        metodo: Nombre del método de embebido
+
+    Returns:
+        Semilla entera no negativa de 31 bits, o SEMILLA_ALEATORIA
+    """
+    if semilla_maestra == SEMILLA_ALEATORIA:
+        return SEMILLA_ALEATORIA
+    contenido = f"{semilla_maestra}:{smiles}:{metodo}".encode()
+    return int.from_bytes(hashlib.sha256(contenido).digest()[:4], "little") & 0x7FFFFFFF
+
+def obtener_parametros_embebido(metodo):
+    """
+    Construye los parámetros de embebido de RDKit para un método de conformación
+
+    Args:
+        metodo: Nombre del método (ETKDGv2, ETKDGv1, ETDG, KDG o DG)
+
+    Returns:
+        Objeto EmbedParameters configurado para el método
+    """
+    if metodo == "ETKDGv2":
+        return AllChem.ETKDGv2()
+    if metodo == "ETKDGv1":
+        return AllChem.ETKDG()
+    if metodo == "ETDG":
+        return AllChem.ETDG()
+    if metodo == "KDG":
+        return AllChem.KDG()
+    if metodo == "DG":
+        # Geometría de distancias sin conocimiento previo, como en los métodos UFF/MMFF
+        parametros = AllChem.EmbedParameters()
+        parametros.useBasicKnowledge = False
+        parametros.useExpTorsionAnglePrefs = False
+        return parametros
+    raise ValueError(f"Método de conformación desconocido: {metodo}")
+
+def generar_conformaciones_multiples(molecula_preparada, metodo, numero_conformaciones,
+                                     semilla=SEMILLA_ALEATORIA, max_iteraciones=0):
+    """
+    Genera todas las conformaciones de una molécula para un método con una sola
+    llamada a EmbedMultipleConfs (una molécula con N conformaciones)
+
+    Args:
+        molecula_preparada: MoleculaPreparada de la molécula
+        metodo: Nombre del método de conformación
+        numero_conformaciones: Número de conformaciones a generar
+        semilla: Semilla de embebido del método
+        max_iteraciones: Límite de iteraciones del embebido (0 = valor de RDKit)
+
+    Returns:
+        Molécula con hidrógenos y sus conformaciones
+    """
+    mol_con_hidrogenos = molecula_preparada.nueva_molecula()
+
+    parametros = obtener_parametros_embebido(metodo)
+    parametros.randomSeed = semilla
+    parametros.maxIterations = max_iteraciones
+    AllChem.EmbedMultipleConfs(mol_con_hidrogenos, numero_conformaciones, parametros)
+
+    return mol_con_hidrogenos
+
+def generar_conformaciones_dg_campos_fuerza(molecula_preparada, numero_conformaciones,
+                                            semilla=SEMILLA_ALEATORIA, max_iteraciones=0):
+    """
+    Embebe una sola vez con geometría de distancias (DG) y optimiza copias de
+    las mismas geometrías iniciales con UFF y con MMFF
+
+    Args:
+        molecula_preparada: MoleculaPreparada de la molécula
+        numero_conformaciones: Número de conformaciones a generar
+        semilla: Semilla del embebido DG compartido
+        max_iteraciones: Límite de iteraciones del embebido (0 = valor de RDKit)
+
+    Returns:
+        Diccionario {"DGuff": molécula, "DGmmff": molécula}; el valor es None si
+        el campo de fuerza no dispone de parámetros para la molécula
+    """
+    conformaciones = {metodo: None for metodo in METODOS_CAMPO_FUERZA}
+
+    tiene_uff = molecula_preparada.tiene_parametros_uff
+    tiene_mmff = molecula_preparada.tiene_parametros_mmff
+    if not (tiene_uff or tiene_mmff):
+        return conformaciones
+
+    # Embebido DG compartido por ambos campos de fuerza
+    mol_con_hidrogenos = molecula_preparada.nueva_molecula()
+    parametros = obtener_parametros_embebido("DG")
+    parametros.randomSeed = semilla
+    parametros.maxIterations = max_iteraciones
+    AllChem.EmbedMultipleConfs(mol_con_hidrogenos, numero_conformaciones, parametros)
+    hay_conformaciones = mol_con_hidrogenos.GetNumConformers() > 0
+
+    # Optimizar copias de las geometrías iniciales con cada campo de fuerza
+    if tiene_uff:
+        mol_uff = Chem.Mol(mol_con_hidrogenos)
+        if hay_conformaciones:
+            campo_uff = AllChem.UFFGetMoleculeForceField(mol_uff)
+            AllChem.OptimizeMoleculeConfs(mol_uff, campo_uff)
+        conformaciones["DGuff"] = mol_uff
+    if tiene_mmff:
+        mol_mmff = Chem.Mol(mol_con_hidrogenos)
+        if hay_conformaciones:
+            # Reutilizar las propiedades MMFF ya calculadas para la molécula
+            campo_mmff = AllChem.MMFFGetMoleculeForceField(mol_mmff,
+                                                          molecula_preparada.propiedades_mmff)
+            AllChem.OptimizeMoleculeConfs(mol_mmff, campo_mmff)
+        conformaciones["DGmmff"] = mol_mmff
+
+    return conformaciones
+
+def generar_conjuntos_conformaciones(molecula_preparada, numero_conformaciones, metodos=None,
+                                     semilla_maestra=SEMILLA_ALEATORIA,
+                                     max_iteraciones_embebido=0):
+    """
+    Genera de forma perezosa los conjuntos de conformaciones de una molécula:
+    cada método se embebe sólo cuando la etapa de descriptores lo solicita
+
+    Args:
+        molecula_preparada: MoleculaPreparada de la molécula
+        numero_conformaciones: Número de conformaciones por método
+        metodos: Métodos a generar (por defecto, todos)
+        semilla_maestra: Semilla de la ejecución de la que se deriva la de cada método
+        max_iteraciones_embebido: Límite de iteraciones de cada embebido
+
+    Yields:
+        Tuplas (metodo, sufijo, molécula con conformaciones o None)
+    """
+    conformaciones_dg = None
+
+    for metodo, sufijo in METODOS_CONFORMACION:
+        if metodos is not None and metodo not in metodos:
+            continue
+        if metodo in METODOS_CAMPO_FUERZA:
+            # UFF y MMFF comparten un único embebido DG por molécula
+            if conformaciones_dg is None:
+                semilla = semilla_unidad(semilla_maestra, molecula_preparada.smiles_canonico, "DG")
+                conformaciones_dg = generar_conformaciones_dg_campos_fuerza(
+                    molecula_preparada, numero_conformaciones, semilla, max_iteraciones_embebido)
+            yield metodo, sufijo, conformaciones_dg.pop(metodo)
+        else:
+            semilla = semilla_unidad(semilla_maestra, molecula_preparada.smiles_canonico, metodo)
+            yield metodo, sufijo, generar_conformaciones_multiples(
+                molecula_preparada, metodo, numero_conformaciones, semilla,
+                max_iteraciones_embebido)
+
+def iterar_descriptores_conformaciones(motor, molecula_multiconformacion,
+                                       puntos_superficie=None, propiedades_atomicas=None):
+    """
+    Calcula descriptores 3D conformación a conformación. Los bloques nativos se
+    evalúan por tramos de conformaciones (véase conformaciones_por_pasada), de
+    modo que la memoria no depende del número de conformaciones
+
+    Args:
+        motor: MotorDescriptores3D con los descriptores 3D
+        molecula_multiconformacion: Molécula con N conformaciones (o None)
+        puntos_superficie: Puntos por átomo del cálculo de áreas (None para la
+            malla de Mordred)
+        propiedades_atomicas: PropiedadesAtomicas ya calculadas de la molécula
+            (None para obtenerlas de molecula_multiconformacion)
+
+    Yields:
+        Array [descriptor] por conformación; los valores que no pudieron
+        calcularse quedan como NaN
+    """
+    if molecula_multiconformacion is None:
+        return
+
+    conformaciones = list(molecula_multiconformacion.GetConformers())
+    paso = conformaciones_por_pasada(molecula_multiconformacion.GetNumAtoms())
+    for inicio in range(0, len(conformaciones), paso):
+        yield from motor.calcular(molecula_multiconformacion, puntos_superficie,
+                                  propiedades_atomicas, conformaciones[inicio:inicio + paso])
+
+def calcular_descriptores_conformaciones(motor, molecula_multiconformacion,
+                                         numero_conformaciones, puntos_superficie=None,
+                                         propiedades_atomicas=None):
+    """
+    Calcula descriptores 3D para cada conformación de una molécula
+
+    Args:
+        motor: MotorDescriptores3D con los descriptores 3D
+        molecula_multiconformacion: Molécula con N conformaciones (o None)
+        numero_conformaciones: Número de conformaciones esperadas (iteraciones)
+        puntos_superficie: Puntos por átomo del cálculo de áreas (None para la
+            malla de Mordred)
+        propiedades_atomicas: PropiedadesAtomicas ya calculadas de la molécula
+            (None para obtenerlas de molecula_multiconformacion)
+
+    Returns:
+        Array [iteración, descriptor]; los valores que no pudieron calcularse
+        y las conformaciones que no pudieron generarse quedan como NaN
+    """
+    valores = np.full((numero_conformaciones, len(motor.nombres)), np.nan)
+
+    for fila, valores_conformacion in enumerate(
+            iterar_descriptores_conformaciones(motor, molecula_multiconformacion,
+                                               puntos_superficie, propiedades_atomicas)):
+        valores[fila] = valores_conformacion
+
+    return valores
+
+def crear_calculador_3d():
+    """
+    Crea el calculador de Mordred restringido a NOMBRES_DESCRIPTORES_3D
+
+    Returns:
+        Calculador de Mordred con los descriptores 3D disponibles
+    """
+    # Crear calculador temporal para filtrar descriptores
+    calculador_temporal = Calculator(descriptors, ignore_3D=False)
 
-print("Cálculo de descriptores completado.")
+    # Filtrar descriptores disponibles
+    descriptores_filtrados = []
+    for descriptor in calculador_temporal.descriptors:
+        if descriptor.__str__() in NOMBRES_DESCRIPTORES_3D:
+            descriptores_filtrados.append(descriptor)
 
-# Mostrar ejemplo de resultados
-print(f"\nEjemplo de resultados (iteración 1): {resultados_descriptores[1].shape}")
+    return Calculator(descriptores_filtrados, ignore_3D=False)
+
+def calcular_descriptores_2d(calculador, moleculas, numero_trabajadores, ruta_cache=None):
+    """
+    Calcula descriptores 2D como matriz numérica: los valores faltantes o con
+    error de Mordred se convierten directamente en NaN
+
+    Args:
+        calculador: Calculador de Mordred con descriptores 2D
+        moleculas: Lista de objetos moleculares RDKit (None si no es válida)
+        numero_trabajadores: Número de procesos para Mordred
+        ruta_cache: Caché persistente de descriptores (None para no usarla)
+
+    Returns:
+        DataFrame float64 con una fila por molécula
+    """
+    columnas = [str(descriptor) for descriptor in calculador.descriptors]
+    filas_pendientes = [fila for fila, molecula in enumerate(moleculas) if molecula is not None]
+
+    # Las moléculas no válidas quedan como filas NaN
+    matriz = np.full((len(moleculas), len(columnas)), np.nan)
+
+    # Recuperar de la caché las moléculas ya calculadas en ejecuciones previas
+    cache = CacheDescriptores(ruta_cache) if ruta_cache is not None else None
+    claves_cache = {}
+    if cache is not None:
+        for fila in filas_pendientes:
+            clave = clave_descriptores_2d(Chem.MolToSmiles(moleculas[fila]), columnas)
+            guardado = cache.leer(clave)
+            if guardado is None:
+                claves_cache[fila] = clave
+            else:
+                matriz[fila] = guardado
+        filas_pendientes = list(claves_cache)
+
+    try:
+        resultados = calculador.map([moleculas[fila] for fila in filas_pendientes],
+                                    nproc=numero_trabajadores)
+        for fila, resultado in zip(filas_pendientes, resultados):
+            matriz[fila] = list(resultado.fill_missing(np.nan))
+            if cache is not None:
+                cache.guardar(claves_cache[fila], matriz[fila])
+    finally:
+        if cache is not None:
+            cache.cerrar()
+
+    return pd.DataFrame(matriz, columns=columnas)
 
 # ----------------------------------------------------------------------------
-# ANÁLISIS ESTADÍSTICO DE DISTRIBUCIONES
+# DESCRIPTORES 3D NATIVOS VECTORIZADOS SOBRE CONFORMACIONES
 # ----------------------------------------------------------------------------
 
-print("\n=== INICIANDO ANÁLISIS ESTADÍSTICO ===")
+class EspacioGeometrico:
+    """
+    Geometría compartida de la pila de conformaciones de una molécula. Cada
+    magnitud (matriz de distancias, centroide, centro de masas, coordenadas
+    centradas...) se calcula una sola vez, cuando la pide la primera familia de
+    descriptores nativos que la necesita, y el resto de familias la reutiliza.
 
-# Diccionario para almacenar estadísticas de distribución por molécula
-estadisticas_distribucion = {}
+    Args:
+        molecula_multiconformacion: Molécula con hidrógenos y N conformaciones
+        coordenadas: Array [conformación, átomo, 3]
+        puntos_superficie: Puntos por átomo del cálculo de áreas (None para la
+            malla de Mordred; véase malla_esfera)
+        propiedades_atomicas: PropiedadesAtomicas de la molécula (None para
+            calcularlas a partir de molecula_multiconformacion)
+    """
 
-# Calcular estadísticas para cada molécula
-for indice_molecula in indices_moleculas:
-    print(f"Analizando distribución para molécula {indice_molecula + 1}/{len(indices_moleculas)}...")
-    
-    # Recopilar valores de todos los descriptores para esta molécula en todas las iteraciones
-    valores_molecula = pd.DataFrame()
-    
-    for iteracion in lista_iteraciones:
-        serie_valores = pd.Series(resultados_descriptores[iteracion].iloc[indice_molecula])
-        valores_molecula = valores_molecula.append(serie_valores, ignore_index=True)
-    
-    # Calcular estadísticas descriptivas (desde percentil 25 en adelante)
-    estadisticas_distribucion[indice_molecula] = valores_molecula.describe()[3:]
+    def __init__(self, molecula_multiconformacion, coordenadas, puntos_superficie=None,
+                 propiedades_atomicas=None):
+        self.molecula = molecula_multiconformacion
+        self.coordenadas = coordenadas
+        self.puntos_superficie = puntos_superficie
+        if propiedades_atomicas is None:
+            propiedades_atomicas = PropiedadesAtomicas(molecula_multiconformacion)
+        self.propiedades_atomicas = propiedades_atomicas
+        self.numeros_atomicos = propiedades_atomicas.numeros_atomicos
+        self.masas = propiedades_atomicas.masas
+
+    @functools.cached_property
+    def distancias(self):
+        """Array [conformación, átomo, átomo] de distancias interatómicas"""
+        numero_conformaciones, numero_atomos = self.coordenadas.shape[:2]
+        distancias = np.empty((numero_conformaciones, numero_atomos, numero_atomos))
+
+        # Las diferencias [conformación, átomo, átomo, 3] se forman por partes
+        paso = max(1, ELEMENTOS_MAXIMOS_PASADA // (3 * max(1, numero_atomos) ** 2))
+        for inicio in range(0, numero_conformaciones, paso):
+            coordenadas = self.coordenadas[inicio:inicio + paso]
+            diferencias = coordenadas[:, :, np.newaxis] - coordenadas[:, np.newaxis]
+            distancias[inicio:inicio + paso] = np.sqrt(np.sum(diferencias ** 2, axis=-1))
+        return distancias
+
+    @functools.cached_property
+    def centroide(self):
+        return self.coordenadas.mean(axis=1)
+
+    @functools.cached_property
+    def centro_masas(self):
+        return np.einsum("a,cak->ck", self.masas, self.coordenadas) / self.masas.sum()
+
+    @functools.cached_property
+    def centradas_centroide(self):
+        return self.coordenadas - self.centroide[:, np.newaxis]
+
+    @functools.cached_property
+    def centradas_masas(self):
+        return self.coordenadas - self.centro_masas[:, np.newaxis]
+
+    @functools.cached_property
+    def atomos_pesados(self):
+        """
+        Índices de los átomos que Mordred conserva al quitar los hidrógenos
+        (RemoveHs mantiene, por ejemplo, los que definen estereoquímica)
+        """
+        molecula = Chem.Mol(self.molecula, quickCopy=True)
+        for atomo in molecula.GetAtoms():
+            atomo.SetIntProp("indice_original", atomo.GetIdx())
+        sin_hidrogenos = Chem.RemoveHs(molecula, updateExplicitCount=True)
+        return np.array([atomo.GetIntProp("indice_original")
+                         for atomo in sin_hidrogenos.GetAtoms()], dtype=np.intp)
+
+    @functools.cached_property
+    def enlaces(self):
+        """Array [enlace, 2] con los índices de los átomos de cada enlace"""
+        return np.array([(enlace.GetBeginAtomIdx(), enlace.GetEndAtomIdx())
+                         for enlace in self.molecula.GetBonds()], dtype=np.intp).reshape(-1, 2)
+
+    @property
+    def cargas_gasteiger(self):
+        # No dependen de la conformación: se calculan una vez por molécula
+        return self.propiedades_atomicas.cargas_gasteiger
+
+    @functools.cached_property
+    def areas_atomicas(self):
+        """Array [conformación, átomo] de áreas accesibles al disolvente"""
+        radios = radios_sasa(self.numeros_atomicos)
+        puntos_esfera = malla_esfera(self.puntos_superficie)
+        return np.stack([calcular_areas_atomicas(coordenadas, radios, puntos_esfera)
+                         for coordenadas in self.coordenadas])
+
+# Ponderaciones de los 3D-MoRSE en el orden de Mordred: sin ponderar, masa,
+# volumen de van der Waals, electronegatividad de Sanderson y polarizabilidad
+PONDERACIONES_MORSE = ["", "m", "v", "se", "p"]
+
+# Parámetro de dispersión de Mor01 ... Mor32
+DISTANCIAS_MORSE = np.arange(1, 33)
+
+# Número máximo de elementos de los tensores intermedios de una pasada
+# vectorizada; las pilas de conformaciones mayores se procesan por partes
+ELEMENTOS_MAXIMOS_PASADA = 2 ** 22
+
+def conformaciones_por_pasada(numero_atomos):
+    # Conformaciones evaluadas juntas: la matriz de distancias [conformación,
+    # átomo, átomo] de una pasada no supera ELEMENTOS_MAXIMOS_PASADA
+    return max(1, ELEMENTOS_MAXIMOS_PASADA // max(1, numero_atomos) ** 2)
+
+def nombres_morse():
+    return [f"Mor{distancia:02d}{ponderacion}" for ponderacion in PONDERACIONES_MORSE
+            for distancia in DISTANCIAS_MORSE]
+
+@functools.lru_cache(maxsize=None)
+def peso_atomico_morse(ponderacion, numero_atomico):
+    """
+    Propiedad atómica de Mordred relativa a la del carbono, como la usa MoRSE
+
+    Returns:
+        Peso del átomo (1 sin ponderación, NaN si Mordred no tiene el valor)
+    """
+    if not ponderacion:
+        return 1.0
+    propiedad = AtomicProperty(True, ponderacion)
+    return propiedad.prop(Chem.Atom(numero_atomico)) / propiedad.carbon
+
+def pesos_morse(numeros_atomicos):
+    """
+    Returns:
+        Array [ponderación, átomo] en el orden de PONDERACIONES_MORSE
+    """
+    return np.array([[peso_atomico_morse(ponderacion, int(numero_atomico))
+                      for numero_atomico in numeros_atomicos]
+                     for ponderacion in PONDERACIONES_MORSE], dtype=np.float64)
+
+def calcular_morse(distancias, pesos):
+    """
+    Calcula los 3D-MoRSE de todas las conformaciones en una pasada vectorizada:
+    Mor(s) = Σ_{i<j} A_i·A_j·sin((s-1)·r_ij)/((s-1)·r_ij), equivalente a la
+    forma matricial 0.5·A·N·Aᵀ de Mordred
+
+    Args:
+        distancias: Array [conformación, átomo, átomo]
+        pesos: Array [ponderación, átomo] (véase pesos_morse)
+
+    Returns:
+        Array [conformación, ponderación × distancia] en el orden de
+        nombres_morse(); NaN con menos de dos átomos o si falta algún peso
+    """
+    numero_conformaciones, numero_atomos = distancias.shape[:2]
+    resultado = np.full((numero_conformaciones, len(pesos), len(DISTANCIAS_MORSE)), np.nan)
+    if numero_atomos <= 1:
+        return resultado.reshape(numero_conformaciones, -1)
+
+    # La matriz de Mordred es simétrica: cada par i < j contribuye una vez
+    atomos_i, atomos_j = np.triu_indices(numero_atomos, k=1)
+    productos_pesos = pesos[:, atomos_i] * pesos[:, atomos_j]
+
+    paso = max(1, ELEMENTOS_MAXIMOS_PASADA // (len(DISTANCIAS_MORSE) * len(atomos_i)))
+    for inicio in range(0, numero_conformaciones, paso):
+        distancias_pares = distancias[inicio:inicio + paso, atomos_i, atomos_j]
+
+        # sin(k·r) por la recurrencia de Chebyshev, sin evaluar un seno por k:
+        # sin(k·r) = 2·cos(r)·sin((k-1)·r) - sin((k-2)·r)
+        terminos = np.empty((len(distancias_pares), len(DISTANCIAS_MORSE), len(atomos_i)))
+        terminos[:, 0] = 1.0
+        doble_coseno = 2.0 * np.cos(distancias_pares)
+        seno_anterior, seno_actual = np.zeros_like(distancias_pares), np.sin(distancias_pares)
+
+        # Como en Mordred, los átomos superpuestos dejan Mor02-Mor32 como NaN
+        with np.errstate(divide="ignore", invalid="ignore"):
+            inversas = 1.0 / distancias_pares
+            for k in range(1, len(DISTANCIAS_MORSE)):
+                if k > 1:
+                    seno_anterior, seno_actual = (seno_actual,
+                                                  doble_coseno * seno_actual - seno_anterior)
+                terminos[:, k] = seno_actual * inversas / k
+
+        resultado[inicio:inicio + paso] = np.matmul(terminos, productos_pesos.T).transpose(0, 2, 1)
+
+    return resultado.reshape(numero_conformaciones, -1)
+
+def bloque_morse(espacio):
+    return calcular_morse(espacio.distancias, pesos_morse(espacio.numeros_atomicos))
+
+# Ejes principales de inercia, de mayor a menor momento
+EJES_INERCIA = ["X", "Y", "Z"]
+
+def calcular_momentos_inercia(centradas, masas):
+    """
+    Calcula los momentos principales de inercia de todas las conformaciones:
+    construye los tensores de inercia de la pila completa y los diagonaliza con
+    un único eigh apilado
+
+    Args:
+        centradas: Array [conformación, átomo, 3] respecto al centro de masas
+        masas: Array [átomo] con la masa de cada átomo
+
+    Returns:
+        Array [conformación, eje] ordenado de mayor a menor (MOMI-X, -Y, -Z)
+    """
+    # I = Σ m·(|r|²·E - r·rᵀ)
+    segundos_momentos = np.einsum("a,cak,cal->ckl", masas, centradas, centradas)
+    tensores = -segundos_momentos
+    traza = np.trace(segundos_momentos, axis1=1, axis2=2)
+    tensores[:, np.arange(3), np.arange(3)] += traza[:, np.newaxis]
+
+    return np.linalg.eigvalsh(tensores)[:, ::-1]
+
+def calcular_pbf(centradas):
+    """
+    Calcula el PBF (plane of best fit) de todas las conformaciones: distancia
+    media de los átomos al plano de mínimos cuadrados que pasa por su centroide,
+    cuya normal es el último vector singular derecho de las coordenadas
+    centradas
+
+    Args:
+        centradas: Array [conformación, átomo, 3] respecto al centroide
+
+    Returns:
+        Array [conformación, 1]
+    """
+    numero_conformaciones, numero_atomos = centradas.shape[:2]
+
+    # Hasta tres átomos siempre son coplanares
+    if numero_atomos <= 3:
+        return np.zeros((numero_conformaciones, 1))
+
+    normales = np.linalg.svd(centradas, full_matrices=False)[2][:, -1]
+    distancias = np.abs(np.einsum("cak,ck->ca", centradas, normales))
+
+    return distancias.mean(axis=1, keepdims=True)
+
+def bloque_momentos_inercia(espacio):
+    return calcular_momentos_inercia(espacio.centradas_masas, espacio.masas)
+
+def bloque_pbf(espacio):
+    return calcular_pbf(espacio.centradas_centroide)
+
+NOMBRES_GEOMETRICOS = ["GeomDiameter", "GeomRadius", "GeomShapeIndex", "GeomPetitjeanIndex"]
+
+def calcular_indices_geometricos(distancias):
+    """
+    Calcula diámetro y radio geométricos (máxima y mínima excentricidad 3D)
+    y los índices de forma y de Petitjean derivados de ellos
+
+    Args:
+        distancias: Array [conformación, átomo, átomo]
+
+    Returns:
+        Array [conformación, índice] en el orden de NOMBRES_GEOMETRICOS; los
+        índices quedan como NaN cuando su denominador es cero
+    """
+    excentricidades = distancias.max(axis=1)
+    diametro = excentricidades.max(axis=1)
+    radio = excentricidades.min(axis=1)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        indice_forma = np.where(radio != 0, (diametro - radio) / radio, np.nan)
+        indice_petitjean = np.where(diametro != 0, (diametro - radio) / diametro, np.nan)
+
+    return np.stack([diametro, radio, indice_forma, indice_petitjean], axis=1)
+
+def bloque_indices_geometricos(espacio):
+    return calcular_indices_geometricos(espacio.distancias)
+
+NOMBRES_GRAVITACIONALES = ["GRAV", "GRAVH", "GRAVp", "GRAVHp"]
+
+def calcular_indice_gravitacional(distancias, masas, atomos_i, atomos_j):
+    """
+    Returns:
+        Array [conformación] con Σ m_i·m_j / r_ij² sobre los pares indicados
+    """
+    productos_masas = masas[atomos_i] * masas[atomos_j]
+    with np.errstate(divide="ignore"):
+        return np.sum(productos_masas / distancias[:, atomos_i, atomos_j] ** 2, axis=1)
+
+def calcular_indices_gravitacionales(distancias, masas, atomos_pesados, enlaces):
+    """
+    Calcula los índices gravitacionales sobre todos los pares de átomos y sobre
+    los pares enlazados, con y sin hidrógenos
 
-print("Análisis estadístico completado.")
+    Args:
+        distancias: Array [conformación, átomo, átomo]
+        masas: Array [átomo]
+        atomos_pesados: Índices de los átomos sin hidrógeno
+        enlaces: Array [enlace, 2]
 
-# Ejemplo de estadísticas para la molécula 2
-print(f"\nEjemplo de estadísticas (molécula 2): {estadisticas_distribucion[2].shape}")
+    Returns:
+        Array [conformación, índice] en el orden de NOMBRES_GRAVITACIONALES
+    """
+    todos_i, todos_j = np.triu_indices(distancias.shape[1], k=1)
+    pesados_i, pesados_j = (atomos_pesados[indices]
+                            for indices in np.triu_indices(len(atomos_pesados), k=1))
+    es_pesado = np.zeros(distancias.shape[1], dtype=bool)
+    es_pesado[atomos_pesados] = True
+    enlaces_pesados = enlaces[es_pesado[enlaces].all(axis=1)]
+
+    indices = np.stack([
+        calcular_indice_gravitacional(distancias, masas, pesados_i, pesados_j),
+        calcular_indice_gravitacional(distancias, masas, todos_i, todos_j),
+        calcular_indice_gravitacional(distancias, masas, enlaces_pesados[:, 0],
+                                      enlaces_pesados[:, 1]),
+        calcular_indice_gravitacional(distancias, masas, enlaces[:, 0], enlaces[:, 1]),
+    ], axis=1)
+
+    # Como en Mordred, dos átomos superpuestos dejan como NaN los índices de
+    # su conjunto de átomos, estén o no enlazados
+    superpuestos_pesados = np.any(distancias[:, pesados_i, pesados_j] == 0, axis=1)
+    superpuestos_todos = np.any(distancias[:, todos_i, todos_j] == 0, axis=1)
+    indices[superpuestos_pesados[:, np.newaxis] & np.array([True, False, True, False])] = np.nan
+    indices[superpuestos_todos[:, np.newaxis] & np.array([False, True, False, True])] = np.nan
+    return indices
+
+def bloque_indices_gravitacionales(espacio):
+    return calcular_indices_gravitacionales(espacio.distancias, espacio.masas,
+                                            espacio.atomos_pesados, espacio.enlaces)
+
+# Radio de la sonda de disolvente (Å) y nivel de la malla esférica de Mordred,
+# con 5·4^nivel - 8 puntos por átomo
+RADIO_DISOLVENTE = 1.4
+NIVEL_MALLA_SASA = 5
+
+@functools.lru_cache(maxsize=None)
+def malla_esfera(numero_puntos=None):
+    """
+    Puntos de la esfera unidad con los que se muestrea la superficie de cada
+    átomo. Por defecto es el icosaedro subdividido de Mordred (5112 puntos,
+    resultados idénticos a Mordred); con un número de puntos se usa una espiral
+    de Fibonacci, que reparte los puntos de forma casi uniforme y por ello da
+    menos error por punto que una malla de Mordred de nivel inferior.
+
+    Args:
+        numero_puntos: Puntos de la espiral de Fibonacci (None para la malla
+            de Mordred)
+
+    Returns:
+        Array [punto, 3]
+    """
+    if numero_puntos is None:
+        return np.ascontiguousarray(SphereMesh(NIVEL_MALLA_SASA).vertices)
+
+    indices = np.arange(numero_puntos) + 0.5
+    alturas = 1.0 - 2.0 * indices / numero_puntos
+    radios_paralelos = np.sqrt(1.0 - alturas ** 2)
+    azimuts = np.pi * (1.0 + np.sqrt(5.0)) * indices
+    return np.stack([radios_paralelos * np.cos(azimuts), radios_paralelos * np.sin(azimuts),
+                     alturas], axis=1)
+
+def radios_sasa(numeros_atomicos):
+    return np.array([vdw_radii[int(numero_atomico)] for numero_atomico in numeros_atomicos]) \
+        + RADIO_DISOLVENTE
+
+# Celdas vecinas (incluida la propia) de la búsqueda por celdas
+DESPLAZAMIENTOS_CELDAS = np.array(list(itertools.product((-1, 0, 1), repeat=3)))
+
+def pares_vecinos(coordenadas, radios):
+    """
+    Busca los pares de esferas que se solapan con una lista de celdas de lado
+    igual al mayor diámetro: sólo se comparan átomos de celdas contiguas, por
+    lo que el coste crece linealmente con el número de átomos
+
+    Args:
+        coordenadas: Array [átomo, 3]
+        radios: Array [átomo]
+
+    Returns:
+        Tupla (atomos_i, atomos_j, distancias) con los pares i != j tales que
+        r_ij <= radio_i + radio_j, ordenados por i y por distancia
+    """
+    celdas = np.floor((coordenadas - coordenadas.min(axis=0)) / (2.0 * radios.max()))
+    celdas = celdas.astype(np.intp)
+    dimensiones = celdas.max(axis=0) + 1
+    orden = np.argsort(np.ravel_multi_index(celdas.T, dimensiones), kind="stable")
+    claves_ordenadas = np.ravel_multi_index(celdas[orden].T, dimensiones)
+
+    lista_i, lista_j = [], []
+    for desplazamiento in DESPLAZAMIENTOS_CELDAS:
+        vecinas = celdas + desplazamiento
+        validas = np.all((vecinas >= 0) & (vecinas < dimensiones), axis=1)
+        claves = np.ravel_multi_index(vecinas[validas].T, dimensiones)
+        inicios = np.searchsorted(claves_ordenadas, claves, side="left")
+        cuentas = np.searchsorted(claves_ordenadas, claves, side="right") - inicios
+
+        # Cada átomo se empareja con todos los átomos de la celda vecina
+        desfases = np.repeat(inicios - np.cumsum(cuentas) + cuentas, cuentas)
+        lista_i.append(np.repeat(np.flatnonzero(validas), cuentas))
+        lista_j.append(orden[desfases + np.arange(cuentas.sum())])
+
+    atomos_i, atomos_j = np.concatenate(lista_i), np.concatenate(lista_j)
+    distancias = np.sqrt(np.sum((coordenadas[atomos_i] - coordenadas[atomos_j]) ** 2, axis=1))
+    solapan = (atomos_i != atomos_j) & (distancias <= radios[atomos_i] + radios[atomos_j])
+    atomos_i, atomos_j, distancias = atomos_i[solapan], atomos_j[solapan], distancias[solapan]
+
+    orden_pares = np.lexsort((distancias, atomos_i))
+    return atomos_i[orden_pares], atomos_j[orden_pares], distancias[orden_pares]
+
+def calcular_areas_atomicas(coordenadas, radios, puntos_esfera):
+    """
+    Calcula el área accesible al disolvente de cada átomo de una conformación
+    (método de Shrake-Rupley de Mordred): fracción de los puntos de la esfera
+    de cada átomo que no quedan dentro de ninguna esfera vecina.
+
+    Un punto s de la esfera unidad del átomo i queda dentro del vecino j si
+    s·u_ij >= (r_i² + d_ij² - r_j²) / (2·r_i), con u_ij = x_j - x_i. Los
+    vecinos se recorren por rango de distancia y, para cada rango, un único
+    producto matricial evalúa todos los puntos de todos los átomos que tienen
+    vecino de ese rango (ordenados por número de vecinos, son un prefijo).
+
+    Args:
+        coordenadas: Array [átomo, 3]
+        radios: Array [átomo] de radios de van der Waals más el del disolvente
+        puntos_esfera: Array [punto, 3] de la esfera unidad (véase malla_esfera)
+
+    Returns:
+        Array [átomo] de áreas en Å²; NaN si falta el radio de algún átomo
+    """
+    numero_atomos, numero_puntos = len(radios), len(puntos_esfera)
+    if np.isnan(radios).any():
+        return np.full(numero_atomos, np.nan)
+
+    # Átomos ordenados de más a menos vecinos
+    atomos_i, atomos_j, distancias = pares_vecinos(coordenadas, radios)
+    vecinos_por_atomo = np.bincount(atomos_i, minlength=numero_atomos)
+    orden = np.argsort(-vecinos_por_atomo, kind="stable")
+    posiciones = np.empty(numero_atomos, dtype=np.intp)
+    posiciones[orden] = np.arange(numero_atomos)
+    rangos = np.arange(len(atomos_i)) - np.repeat(np.cumsum(vecinos_por_atomo)
+                                                  - vecinos_por_atomo, vecinos_por_atomo)
+
+    # Direcciones y umbrales [rango, átomo] de cada casquete ocultado por un vecino
+    maximo_vecinos = vecinos_por_atomo.max(initial=0)
+    direcciones = np.zeros((maximo_vecinos, numero_atomos, 3))
+    umbrales = np.full((maximo_vecinos, numero_atomos, 1), np.inf)
+    direcciones[rangos, posiciones[atomos_i]] = coordenadas[atomos_j] - coordenadas[atomos_i]
+    umbrales[rangos, posiciones[atomos_i], 0] = (
+        (radios[atomos_i] ** 2 + distancias ** 2 - radios[atomos_j] ** 2) / (2.0 * radios[atomos_i]))
+    atomos_con_vecino = np.searchsorted(-vecinos_por_atomo[orden], -np.arange(maximo_vecinos),
+                                        side="left")
+
+    puntos_traspuestos = np.ascontiguousarray(puntos_esfera.T)
+    puntos_accesibles = np.empty(numero_atomos, dtype=np.intp)
+
+    # Los átomos se procesan por partes para acotar las matrices [átomo, punto]
+    paso = max(1, ELEMENTOS_MAXIMOS_PASADA // numero_puntos)
+    for inicio in range(0, numero_atomos, paso):
+        fin = min(inicio + paso, numero_atomos)
+        accesibles = np.ones((fin - inicio, numero_puntos), dtype=bool)
+        proyecciones = np.empty((fin - inicio, numero_puntos))
+        fuera = np.empty((fin - inicio, numero_puntos), dtype=bool)
+        for rango in range(maximo_vecinos):
+            filas = min(atomos_con_vecino[rango], fin) - inicio
+            if filas <= 0:
+                break
+            np.matmul(direcciones[rango, inicio:inicio + filas], puntos_traspuestos,
+                      out=proyecciones[:filas])
+            np.less(proyecciones[:filas], umbrales[rango, inicio:inicio + filas],
+                    out=fuera[:filas])
+            accesibles[:filas] &= fuera[:filas]
+        puntos_accesibles[orden[inicio:fin]] = accesibles.sum(axis=1)
+
+    return 4.0 * np.pi * radios ** 2 * puntos_accesibles / numero_puntos
+
+NOMBRES_CPSA = ([f"{familia}{version}" for familia in ("PNSA", "PPSA", "DPSA", "FNSA", "FPSA",
+                                                       "WNSA", "WPSA")
+                 for version in range(1, 6)]
+                + ["RNCS", "RPCS", "TASA", "TPSA", "RASA", "RPSA"])
+
+def areas_cargadas(areas, cargas, mascara):
+    """
+    Returns:
+        Array [conformación, versión] con las áreas parciales cargadas 1-5
+        (PNSA o PPSA) de los átomos de la máscara
+    """
+    cargas_mascara = cargas[mascara]
+    areas_mascara = areas[:, mascara]
+    suma_cargas = np.sum(cargas_mascara)
+
+    # La versión 5 usa la carga media, que no existe si la máscara está vacía
+    version_5 = (np.sum(suma_cargas / np.sum(mascara) * areas_mascara, axis=1)
+                 if np.any(mascara) else np.full(len(areas), np.nan))
+
+    return np.stack([
+        np.sum(areas_mascara, axis=1),
+        np.sum(suma_cargas * areas_mascara, axis=1),
+        np.sum(cargas_mascara * areas_mascara, axis=1),
+        np.sum(suma_cargas / len(cargas) * areas_mascara, axis=1),
+        version_5,
+    ], axis=1)
+
+def area_relativa_carga(areas, cargas, mascara):
+    """
+    Returns:
+        Array [conformación] con RNCS o RPCS: área del átomo de mayor carga
+        absoluta de la máscara dividida por su carga relativa (0 si no hay)
+    """
+    if not np.any(mascara):
+        return np.zeros(len(areas))
+    cargas_mascara = cargas[mascara]
+    maximo = np.argmax(np.abs(cargas_mascara))
+    carga_relativa = cargas_mascara[maximo] / np.sum(cargas_mascara)
+    return areas[:, mascara][:, maximo] / carga_relativa
+
+def calcular_cpsa(areas, cargas):
+    """
+    Calcula los descriptores de superficie parcial cargada de todas las
+    conformaciones a partir de las áreas atómicas y las cargas de Gasteiger
+
+    Args:
+        areas: Array [conformación, átomo] (véase calcular_areas_atomicas)
+        cargas: Array [átomo]
+
+    Returns:
+        Array [conformación, descriptor] en el orden de NOMBRES_CPSA; NaN si
+        falta alguna carga
+    """
+    if np.isnan(cargas).any():
+        return np.full((len(areas), len(NOMBRES_CPSA)), np.nan)
+
+    area_total = areas.sum(axis=1, keepdims=True)
+    negativas = areas_cargadas(areas, cargas, cargas < 0.0)
+    positivas = areas_cargadas(areas, cargas, cargas > 0.0)
+    apolar = areas[:, np.abs(cargas) < 0.2].sum(axis=1)
+    polar = areas[:, np.abs(cargas) >= 0.2].sum(axis=1)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.concatenate([
+            negativas, positivas, positivas - negativas,
+            negativas / area_total, positivas / area_total,
+            negativas * area_total / 1000.0, positivas * area_total / 1000.0,
+            np.stack([area_relativa_carga(areas, cargas, cargas < 0.0),
+                      area_relativa_carga(areas, cargas, cargas > 0.0),
+                      apolar, polar, apolar / area_total[:, 0], polar / area_total[:, 0]],
+                     axis=1),
+        ], axis=1)
+
+def bloque_cpsa(espacio):
+    return calcular_cpsa(espacio.areas_atomicas, espacio.cargas_gasteiger)
+
+# Versión de las implementaciones nativas; forma parte de las claves de caché y
+# de los parámetros del checkpoint para no mezclar resultados de versiones distintas
+VERSION_DESCRIPTORES_NATIVOS = 4
+
+# Familias de descriptores con implementación nativa: (nombres, función) con
+# función(EspacioGeometrico) -> Array [conformación, nombre]
+BLOQUES_NATIVOS = [
+    (nombres_morse(), bloque_morse),
+    ([f"MOMI-{eje}" for eje in EJES_INERCIA], bloque_momentos_inercia),
+    (["PBF"], bloque_pbf),
+    (NOMBRES_GEOMETRICOS, bloque_indices_geometricos),
+    (NOMBRES_GRAVITACIONALES, bloque_indices_gravitacionales),
+    (NOMBRES_CPSA, bloque_cpsa),
+]
+
+class MotorDescriptores3D:
+    """
+    Calcula los descriptores 3D de todas las conformaciones de una molécula.
+    Las familias de BLOQUES_NATIVOS presentes en el calculador se evalúan en
+    una pasada vectorizada sobre la pila de coordenadas, compartiendo un único
+    EspacioGeometrico; el resto se delega en Mordred conformación a
+    conformación. Las columnas conservan el orden del calculador de Mordred.
+
+    Args:
+        calculador: Calculador de Mordred con los descriptores 3D
+    """
+    def __init__(self, calculador):
+        self.nombres = [str(descriptor) for descriptor in calculador.descriptors]
+        posiciones = {nombre: columna for columna, nombre in enumerate(self.nombres)}
+
+        # Sólo se sustituyen las familias completas presentes en el calculador
+        self.bloques_nativos = []
+        nativos = set()
+        for nombres_bloque, funcion in BLOQUES_NATIVOS:
+            if all(nombre in posiciones for nombre in nombres_bloque):
+                columnas = np.array([posiciones[nombre] for nombre in nombres_bloque])
+                self.bloques_nativos.append((columnas, funcion))
+                nativos.update(nombres_bloque)
+
+        restantes = [descriptor for descriptor in calculador.descriptors
+                     if str(descriptor) not in nativos]
+        self.columnas_mordred = np.array([posiciones[str(descriptor)] for descriptor in restantes],
+                                         dtype=np.intp)
+        self.calculador_mordred = Calculator(restantes, ignore_3D=False) if restantes else None
+
+    def calcular(self, molecula_multiconformacion, puntos_superficie=None,
+                 propiedades_atomicas=None, conformaciones=None):
+        """
+        Args:
+            molecula_multiconformacion: Molécula con N conformaciones
+            puntos_superficie: Puntos por átomo del cálculo de áreas (None para
+                la malla de Mordred; véase malla_esfera)
+            propiedades_atomicas: PropiedadesAtomicas ya calculadas de la
+                molécula (None para obtenerlas de molecula_multiconformacion)
+            conformaciones: Conformaciones a calcular (por defecto, todas)
+
+        Returns:
+            Array [conformación, descriptor]; los valores que no pudieron
+            calcularse quedan como NaN
+        """
+        if conformaciones is None:
+            conformaciones = list(molecula_multiconformacion.GetConformers())
+        valores = np.full((len(conformaciones), len(self.nombres)), np.nan)
+        if not conformaciones:
+            return valores
+
+        coordenadas = np.stack([conformacion.GetPositions() for conformacion in conformaciones])
+        espacio = EspacioGeometrico(molecula_multiconformacion, coordenadas, puntos_superficie,
+                                    propiedades_atomicas)
+        for columnas, funcion in self.bloques_nativos:
+            valores[:, columnas] = funcion(espacio)
+
+        if self.calculador_mordred is not None:
+            for fila, conformacion in enumerate(conformaciones):
+                resultado = self.calculador_mordred(molecula_multiconformacion,
+                                                    id=conformacion.GetId())
+                valores[fila, self.columnas_mordred] = list(resultado.fill_missing(np.nan))
+
+        return valores
 
 # ----------------------------------------------------------------------------
-# PREPARACIÓN DE MATRIZ FINAL DE CARACTERÍSTICAS
+# ALMACENAMIENTO DE RESULTADOS 3D
 # ----------------------------------------------------------------------------
 
-print("\n=== PREPARANDO MATRIZ FINAL DE CARACTERÍSTICAS ===")
+def nombres_columnas_3d(nombres_descriptores):
+    """
+    Genera los nombres de columna de todos los métodos (descriptor + sufijo)
 
-# Obtener estructura de nombres para las columnas finales
-muestra_estadisticas = estadisticas_distribucion[1]
-indices_estadisticas = list(range(len(muestra_estadisticas)))
-indices_descriptores = list(range(len(muestra_estadisticas.T)))
+    Args:
+        nombres_descriptores: Nombres de los descriptores 3D
 
-# Generar nombres de columnas combinando estadística + descriptor
-nombres_columnas_finales = []
-for indice_descriptor in indices_descriptores:
-    for indice_estadistica in indices_estadisticas:
-        nombre_columna = (muestra_estadisticas.index[indice_estadistica] + 
-                         muestra_estadisticas.columns[indice_descriptor])
-        nombres_columnas_finales.append(nombre_columna)
+    Returns:
+        Lista de nombres de columna, agrupados por método
+    """
+    return [nombre + sufijo for _, sufijo in METODOS_CONFORMACION for nombre in nombres_descriptores]
 
-print(f"Nombres de columnas generados: {len(nombres_columnas_finales)}")
+def dataframe_molecula(valores_molecula, columnas):
+    """
+    Convierte los valores de una molécula [método, iteración, descriptor] en un
+    DataFrame con una fila por iteración y una columna por descriptor y método
+    """
+    numero_iteraciones = valores_molecula.shape[1]
+    valores = valores_molecula.transpose(1, 0, 2).reshape(numero_iteraciones, -1)
+    return pd.DataFrame(valores, columns=columnas)
 
-# Construir matriz final de características estadísticas 3D
-matriz_descriptores_estadisticos = pd.DataFrame()
+# Estadísticas de distribución calculadas sobre las iteraciones
+ESTADISTICAS_DISTRIBUCION = ["min", "25%", "50%", "75%", "max"]
 
-for indice_molecula in indices_moleculas:
-    # Recopilar todos los valores para esta molécula
-    valores_molecula = pd.DataFrame()
-    
-    for iteracion in lista_iteraciones:
-        serie_valores = pd.Series(resultados_descriptores[iteracion].iloc[indice_molecula])
-        valores_molecula = valores_molecula.append(serie_valores, ignore_index=True)
-    
-    # Calcular estadísticas y reorganizar en formato vectorial
-    estadisticas_molecula = valores_molecula.describe()[3:]
-    fila_estadisticas = pd.DataFrame(estadisticas_molecula.values.reshape(1, 
-                                   len(estadisticas_molecula) * len(estadisticas_molecula.T), 
-                                   order='F'))
-    
-    matriz_descriptores_estadisticos = matriz_descriptores_estadisticos.append(fila_estadisticas, 
-                                                                              ignore_index=True)
+def calcular_estadisticas_distribucion(valores, eje):
+    """
+    Calcula min/25%/50%/75%/max a lo largo del eje de iteraciones en una sola
+    pasada vectorizada, ignorando los valores NaN (equivale a describe()[3:])
+
+    Args:
+        valores: Array con los valores de los descriptores
+        eje: Eje de las iteraciones
+
+    Returns:
+        Array con la misma forma que valores, sustituyendo el eje de
+        iteraciones por el de ESTADISTICAS_DISTRIBUCION
+    """
+    with warnings.catch_warnings():
+        # Descriptores sin ningún valor válido producen NaN sin aviso
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+        minimo = np.nanmin(valores, axis=eje)
+        cuartiles = np.nanpercentile(valores, [25, 50, 75], axis=eje)
+        maximo = np.nanmax(valores, axis=eje)
+
+    return np.stack([minimo, *cuartiles, maximo], axis=eje)
+
+class AcumuladorEstadisticas:
+    """
+    Estadísticas de distribución en flujo (streaming) para un vector de
+    descriptores: se actualizan con cada conformación sin guardar los valores
+
+    Mantiene mínimo y máximo exactos y cuartiles aproximados con el algoritmo
+    P² (Jain y Chlamtac, 1985), de forma independiente para cada descriptor e
+    ignorando los NaN. Con cinco valores o menos los cuartiles son exactos. La
+    memoria no depende del número de iteraciones.
+    """
+
+    # Cuantiles estimados con P², en el orden de ESTADISTICAS_DISTRIBUCION
+    CUANTILES = (0.25, 0.50, 0.75)
+
+    def __init__(self, numero_descriptores):
+        forma = (numero_descriptores,)
+        self.conteo = np.zeros(forma, dtype=np.int64)
+        self.minimo = np.full(forma, np.nan)
+        self.maximo = np.full(forma, np.nan)
+
+        # Marcadores P² por cuantil: alturas, posiciones reales y deseadas
+        numero_cuantiles = len(self.CUANTILES)
+        p = np.array(self.CUANTILES)[:, np.newaxis]
+        self._alturas = np.full((numero_cuantiles, numero_descriptores, 5), np.nan)
+        self._posiciones = np.tile(np.arange(1.0, 6.0), (numero_cuantiles, numero_descriptores, 1))
+        posiciones_deseadas = np.concatenate([np.ones_like(p), 1 + 2 * p, 1 + 4 * p, 3 + 2 * p,
+                                              np.full_like(p, 5.0)], axis=1)
+        self._posiciones_deseadas = np.repeat(posiciones_deseadas[:, np.newaxis, :],
+                                              numero_descriptores, axis=1)
+        self._incrementos = np.concatenate([np.zeros_like(p), p / 2, p, (1 + p) / 2,
+                                            np.ones_like(p)], axis=1)
+
+    def actualizar(self, valores):
+        """
+        Incorpora los descriptores de una conformación
+
+        Args:
+            valores: Array [descriptor], con NaN para los valores faltantes
+        """
+        validos = ~np.isnan(valores)
+        conteo_previo = self.conteo.copy()
+        self.conteo[validos] += 1
+
+        # Mínimo y máximo exactos
+        self.minimo = np.fmin(self.minimo, valores)
+        self.maximo = np.fmax(self.maximo, valores)
+
+        # Los cinco primeros valores se guardan como marcadores iniciales
+        iniciales = np.nonzero(validos & (conteo_previo < 5))[0]
+        self._alturas[:, iniciales, conteo_previo[iniciales]] = valores[iniciales]
+        completos = iniciales[self.conteo[iniciales] == 5]
+        self._alturas[:, completos] = np.sort(self._alturas[:, completos], axis=-1)
+
+        actualizables = np.nonzero(validos & (conteo_previo >= 5))[0]
+        if len(actualizables):
+            for indice_cuantil in range(len(self.CUANTILES)):
+                self._actualizar_p2(indice_cuantil, actualizables, valores[actualizables])
+
+    def _actualizar_p2(self, indice_cuantil, descriptores, x):
+        """
+        Paso del algoritmo P² para un cuantil sobre los descriptores indicados
+        """
+        q = self._alturas[indice_cuantil, descriptores]
+        n = self._posiciones[indice_cuantil, descriptores]
+        n_deseada = self._posiciones_deseadas[indice_cuantil, descriptores]
+
+        # Ajustar extremos y localizar la celda k con q[k] <= x < q[k + 1]
+        q[:, 0] = np.minimum(q[:, 0], x)
+        q[:, 4] = np.maximum(q[:, 4], x)
+        k = np.sum(x[:, np.newaxis] >= q[:, 1:4], axis=1)
+
+        n += np.arange(5) > k[:, np.newaxis]
+        n_deseada += self._incrementos[indice_cuantil]
+
+        # Ajustar los marcadores centrales con interpolación parabólica o lineal
+        filas = np.arange(len(descriptores))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            for i in (1, 2, 3):
+                d = n_deseada[:, i] - n[:, i]
+                mover = (((d >= 1) & (n[:, i + 1] - n[:, i] > 1)) |
+                         ((d <= -1) & (n[:, i - 1] - n[:, i] < -1)))
+                signo = np.where(d >= 0, 1.0, -1.0)
+
+                parabolica = q[:, i] + signo / (n[:, i + 1] - n[:, i - 1]) * (
+                    (n[:, i] - n[:, i - 1] + signo) * (q[:, i + 1] - q[:, i]) / (n[:, i + 1] - n[:, i]) +
+                    (n[:, i + 1] - n[:, i] - signo) * (q[:, i] - q[:, i - 1]) / (n[:, i] - n[:, i - 1]))
+
+                vecino = i + signo.astype(int)
+                lineal = q[:, i] + signo * (q[filas, vecino] - q[:, i]) / (n[filas, vecino] - n[:, i])
+
+                valida = (q[:, i - 1] < parabolica) & (parabolica < q[:, i + 1])
+                q[:, i] = np.where(mover, np.where(valida, parabolica, lineal), q[:, i])
+                n[:, i] += np.where(mover, signo, 0.0)
+
+        self._alturas[indice_cuantil, descriptores] = q
+        self._posiciones[indice_cuantil, descriptores] = n
+        self._posiciones_deseadas[indice_cuantil, descriptores] = n_deseada
+
+    def estadisticas(self):
+        """
+        Devuelve las estadísticas acumuladas
+
+        Returns:
+            Array [estadística, descriptor] en el orden de ESTADISTICAS_DISTRIBUCION
+        """
+        with warnings.catch_warnings():
+            # Descriptores sin ningún valor válido producen NaN sin aviso
+            warnings.simplefilter("ignore", category=RuntimeWarning)
+            exactos = np.nanpercentile(self._alturas, [100 * p for p in self.CUANTILES], axis=-1)
+
+        # Con cinco valores o menos se usa el percentil exacto de los valores guardados
+        cuartiles = [np.where(self.conteo > 5, self._alturas[indice, :, 2], exactos[indice, indice])
+                     for indice in range(len(self.CUANTILES))]
+
+        return np.stack([self.minimo, *cuartiles, self.maximo])
+
+class ResultadosDescriptores:
+    """
+    Tensor preasignado con los descriptores 3D de todas las conformaciones, con
+    forma [molécula, método, iteración, descriptor], y vistas etiquetadas
+
+    resultados[iteracion] devuelve el DataFrame de una iteración (una fila por
+    molécula), con las mismas columnas que el resto del análisis.
+    """
+
+    def __init__(self, numero_moleculas, numero_iteraciones, nombres_descriptores,
+                 dtype=np.float64):
+        self.metodos = [metodo for metodo, _ in METODOS_CONFORMACION]
+        self.nombres_descriptores = list(nombres_descriptores)
+        self.columnas = nombres_columnas_3d(self.nombres_descriptores)
+        self.tensor = np.full((numero_moleculas, len(self.metodos), numero_iteraciones,
+                               len(self.nombres_descriptores)), np.nan, dtype=dtype)
+
+    def __setitem__(self, indice_molecula, valores_molecula):
+        self.tensor[indice_molecula] = valores_molecula
+
+    def __getitem__(self, iteracion):
+        valores = self.tensor[:, :, iteracion, :].reshape(self.tensor.shape[0], len(self.columnas))
+        return pd.DataFrame(valores, columns=self.columnas)
+
+    def molecula(self, indice_molecula):
+        """
+        DataFrame de una molécula: una fila por iteración
+        """
+        return dataframe_molecula(self.tensor[indice_molecula], self.columnas)
+
+class EstadisticasDescriptores:
+    """
+    Tensor preasignado con las estadísticas de distribución de cada molécula,
+    con forma [molécula, método, estadística, descriptor], calculadas una sola vez
+
+    estadisticas[indice_molecula] devuelve el resumen de una molécula (una fila
+    por estadística) y matriz() la fila de características de cada molécula.
+    """
+
+    def __init__(self, numero_moleculas, nombres_descriptores, dtype=np.float64):
+        self.metodos = [metodo for metodo, _ in METODOS_CONFORMACION]
+        self.nombres_descriptores = list(nombres_descriptores)
+        self.columnas = nombres_columnas_3d(self.nombres_descriptores)
+        self.tensor = np.full((numero_moleculas, len(self.metodos), len(ESTADISTICAS_DISTRIBUCION),
+                               len(self.nombres_descriptores)), np.nan, dtype=dtype)
+
+    def __setitem__(self, indice_molecula, estadisticas_molecula):
+        self.tensor[indice_molecula] = estadisticas_molecula
+
+    def __getitem__(self, indice_molecula):
+        resumen = dataframe_molecula(self.tensor[indice_molecula], self.columnas)
+        resumen.index = ESTADISTICAS_DISTRIBUCION
+        return resumen
+
+    def nombres_columnas(self):
+        """
+        Nombres de la matriz de características (estadística + descriptor),
+        derivados de los ejes de descriptores y estadísticas
+        """
+        return [estadistica + columna for columna in self.columnas
+                for estadistica in ESTADISTICAS_DISTRIBUCION]
+
+    def matriz(self):
+        """
+        DataFrame con una fila por molécula y las estadísticas de cada
+        descriptor en columnas consecutivas
+        """
+        columnas = self.nombres_columnas()
+        valores = self.tensor.transpose(0, 1, 3, 2).reshape(self.tensor.shape[0], len(columnas))
+        return pd.DataFrame(valores, columns=columnas)
+
+# ----------------------------------------------------------------------------
+# LECTURA DE DATOS DE ENTRADA
+# ----------------------------------------------------------------------------
+
+# Número de moléculas por bloque de lectura
+TAMANO_BLOQUE_ENTRADA = 1000
+
+def abrir_texto(ruta):
+    # Los archivos de texto pueden venir comprimidos con gzip
+    if ruta.lower().endswith(".gz"):
+        return gzip.open(ruta, "rt")
+    return open(ruta)
+
+def moleculas_desde_smiles(lista_smiles):
+    # Las entradas vacías o no interpretables quedan como None
+    return [Chem.MolFromSmiles(smiles) if isinstance(smiles, str) else None
+            for smiles in lista_smiles]
+
+def leer_excel(ruta, columna_smiles, tamano_bloque, texto=False):
+    # Excel no admite lectura incremental: se lee completo y se divide en bloques
+    df_entrada = pd.read_excel(ruta)
+    for inicio in range(0, len(df_entrada), tamano_bloque):
+        bloque = df_entrada.iloc[inicio:inicio + tamano_bloque]
+        yield bloque, moleculas_desde_smiles(bloque[columna_smiles])
+
+def leer_csv(ruta, columna_smiles, tamano_bloque, texto=False):
+    separador = "\t" if ruta.lower().endswith((".tsv", ".tsv.gz")) else ","
+    # Sin texto, pandas deduce el tipo de cada columna en cada bloque por separado
+    for bloque in pd.read_csv(ruta, sep=separador, chunksize=tamano_bloque,
+                              compression="infer", dtype=str if texto else None):
+        yield bloque, moleculas_desde_smiles(bloque[columna_smiles])
+
+def leer_smi(ruta, columna_smiles, tamano_bloque, texto=False):
+    # Formato SMILES: una molécula por línea, seguida opcionalmente de su nombre
+    with abrir_texto(ruta) as archivo:
+        filas = []
+        for linea in archivo:
+            campos = linea.strip().split(None, 1)
+            if not campos or campos[0].startswith("#"):
+                continue
+            filas.append((campos[0], campos[1] if len(campos) > 1 else None))
+            if len(filas) == tamano_bloque:
+                bloque = pd.DataFrame(filas, columns=[columna_smiles, "Nombre"])
+                yield bloque, moleculas_desde_smiles(bloque[columna_smiles])
+                filas = []
+        if filas:
+            bloque = pd.DataFrame(filas, columns=[columna_smiles, "Nombre"])
+            yield bloque, moleculas_desde_smiles(bloque[columna_smiles])
+
+def leer_sdf(ruta, columna_smiles, tamano_bloque, texto=False):
+    # Las propiedades SD de cada registro se conservan como columnas
+    apertura = gzip.open if ruta.lower().endswith(".gz") else open
+    with apertura(ruta, "rb") as archivo:
+        filas, moleculas = [], []
+        for molecula in Chem.ForwardSDMolSupplier(archivo):
+            fila = {}
+            if molecula is not None:
+                fila["Nombre"] = molecula.GetProp("_Name") if molecula.HasProp("_Name") else None
+                fila[columna_smiles] = Chem.MolToSmiles(molecula)
+                fila.update({nombre: molecula.GetProp(nombre) for nombre in molecula.GetPropNames()}
+                            if texto else molecula.GetPropsAsDict())
+            filas.append(fila)
+            moleculas.append(molecula)
+            if len(moleculas) == tamano_bloque:
+                yield pd.DataFrame(filas), moleculas
+                filas, moleculas = [], []
+        if moleculas:
+            yield pd.DataFrame(filas), moleculas
+
+def leer_parquet(ruta, columna_smiles, tamano_bloque, texto=False):
+    import pyarrow.parquet as pq
+    for lote in pq.ParquetFile(ruta).iter_batches(batch_size=tamano_bloque):
+        bloque = lote.to_pandas()
+        yield bloque, moleculas_desde_smiles(bloque[columna_smiles])
+
+# Lectores disponibles por extensión del archivo de entrada y librería requerida
+LECTORES_ENTRADA = {
+    ".xlsx": (leer_excel, "openpyxl"),
+    ".csv": (leer_csv, None),
+    ".csv.gz": (leer_csv, None),
+    ".tsv": (leer_csv, None),
+    ".tsv.gz": (leer_csv, None),
+    ".smi": (leer_smi, None),
+    ".smi.gz": (leer_smi, None),
+    ".smiles": (leer_smi, None),
+    ".sdf": (leer_sdf, None),
+    ".sdf.gz": (leer_sdf, None),
+    ".parquet": (leer_parquet, "pyarrow"),
+}
+
+def obtener_lector_entrada(ruta):
+    """
+    Selecciona el lector de moléculas según la extensión del archivo
+
+    Args:
+        ruta: Ruta del archivo de entrada
+
+    Returns:
+        Función lector(ruta, columna_smiles, tamano_bloque, texto=False)
+
+    Raises:
+        ValueError: Si la extensión no está soportada
+        ImportError: Si falta la librería que requiere el formato
+    """
+    for extension in sorted(LECTORES_ENTRADA, key=len, reverse=True):
+        if ruta.lower().endswith(extension):
+            lector, libreria = LECTORES_ENTRADA[extension]
+            if libreria is not None and importlib.util.find_spec(libreria) is None:
+                raise ImportError(f"El formato {extension} requiere la librería '{libreria}'")
+            return lector
+
+    raise ValueError(f"Formato de entrada no soportado: {ruta} "
+                     f"(extensiones válidas: {', '.join(LECTORES_ENTRADA)})")
+
+# Columna con la fila de entrada de cada molécula en las salidas parciales (shards)
+COLUMNA_FILA_ENTRADA = "fila_entrada"
+
+def leer_moleculas(ruta, columna_smiles="SMILES", tamano_bloque=TAMANO_BLOQUE_ENTRADA,
+                   shard=None, texto=False):
+    """
+    Lee el archivo de entrada por bloques sin cargarlo completo en memoria
+
+    Args:
+        ruta: Ruta del archivo (.xlsx, .csv, .tsv, .smi, .sdf, .parquet)
+        columna_smiles: Columna con las estructuras en formatos tabulares
+        tamano_bloque: Número máximo de moléculas por bloque
+        shard: Tupla (indice_shard, numero_shards) para leer sólo las filas
+            cuyo índice global módulo numero_shards es indice_shard; esas filas
+            llevan además su índice en la columna fila_entrada
+        texto: Lee las columnas originales como texto (string de pandas), de
+            modo que su tipo no cambia de un bloque a otro
+
+    Yields:
+        Tuplas (bloque_original, moleculas): las columnas originales del bloque
+        con índice global y la lista de moléculas RDKit alineada con sus filas
+        (None para las estructuras no válidas)
+    """
+    lector = obtener_lector_entrada(ruta)
+    inicio = 0
+    for bloque, moleculas in lector(ruta, columna_smiles, tamano_bloque, texto):
+        bloque = bloque.reset_index(drop=True)
+        if texto:
+            bloque = bloque.astype("string")
+        bloque.index = bloque.index + inicio
+        inicio += len(bloque)
+
+        if shard is not None:
+            indice_shard, numero_shards = shard
+            seleccion = np.flatnonzero(bloque.index % numero_shards == indice_shard)
+            if len(seleccion) == 0:
+                continue
+            bloque = bloque.iloc[seleccion].copy()
+            bloque.insert(0, COLUMNA_FILA_ENTRADA, bloque.index)
+            moleculas = [moleculas[fila] for fila in seleccion]
+
+        yield bloque, moleculas
+
+# ----------------------------------------------------------------------------
+# ESCRITURA DE RESULTADOS
+# ----------------------------------------------------------------------------
+
+# Límite de columnas de una hoja de Excel
+MAXIMO_COLUMNAS_EXCEL = 16384
+
+# Los parámetros de la ejecución que generó un archivo de resultados se guardan
+# en los metadatos del esquema (Parquet, Feather) o en un JSON adjunto (CSV, Excel)
+CLAVE_PARAMETROS_SALIDA = b"parametros_ejecucion"
+
+def ruta_parametros_salida(ruta):
+    return ruta + ".parametros.json"
+
+def esquema_con_parametros(esquema, parametros):
+    if parametros is None:
+        return esquema
+    metadatos = dict(esquema.metadata or {})
+    metadatos[CLAVE_PARAMETROS_SALIDA] = json.dumps(parametros, sort_keys=True).encode()
+    return esquema.with_metadata(metadatos)
+
+def guardar_parametros_adjuntos(ruta, parametros):
+    # Sin parámetros no debe quedar el JSON de una ejecución anterior
+    ruta_json = ruta_parametros_salida(ruta)
+    if parametros is None:
+        if os.path.exists(ruta_json):
+            os.remove(ruta_json)
+        return
+    with open(ruta_json, "w") as archivo:
+        json.dump(parametros, archivo, sort_keys=True, indent=1)
+
+def tabla_arrow(dataset, parametros):
+    import pyarrow as pa
+    tabla = pa.Table.from_pandas(dataset, preserve_index=False)
+    return tabla.replace_schema_metadata(esquema_con_parametros(tabla.schema, parametros).metadata)
+
+def escribir_parquet(dataset, ruta, parametros=None):
+    import pyarrow.parquet as pq
+    pq.write_table(tabla_arrow(dataset, parametros), ruta)
+
+def escribir_feather(dataset, ruta, parametros=None):
+    # Feather v2 es el formato de archivo Arrow IPC
+    import pyarrow.feather as feather
+    feather.write_feather(tabla_arrow(dataset, parametros), ruta)
+
+def escribir_csv(dataset, ruta, parametros=None):
+    # La compresión se deduce de la extensión (.gz, .bz2, .xz, .zst)
+    dataset.to_csv(ruta, index=False, compression="infer")
+    guardar_parametros_adjuntos(ruta, parametros)
+
+def escribir_excel(dataset, ruta, parametros=None):
+    if dataset.shape[1] > MAXIMO_COLUMNAS_EXCEL:
+        raise ValueError(f"El dataset tiene {dataset.shape[1]} columnas y Excel admite "
+                         f"{MAXIMO_COLUMNAS_EXCEL}; use un formato columnar (.parquet, .feather)")
+    dataset.to_excel(ruta, index=False, na_rep="NA")
+    guardar_parametros_adjuntos(ruta, parametros)
+
+def parametros_salida(ruta):
+    """
+    Parámetros de la ejecución que generó un archivo de resultados
+
+    Returns:
+        Diccionario de parámetros, o None si el archivo no los registra
+    """
+    escritor = obtener_escritor_salida(ruta)
+    if escritor is escribir_parquet:
+        import pyarrow.parquet as pq
+        contenido = (pq.read_schema(ruta).metadata or {}).get(CLAVE_PARAMETROS_SALIDA)
+    elif escritor is escribir_feather:
+        import pyarrow as pa
+        with pa.memory_map(ruta) as fuente:
+            contenido = (pa.ipc.open_file(fuente).schema.metadata or {}).get(CLAVE_PARAMETROS_SALIDA)
+    elif os.path.exists(ruta_parametros_salida(ruta)):
+        with open(ruta_parametros_salida(ruta)) as archivo:
+            contenido = archivo.read()
+    else:
+        contenido = None
+    return None if contenido is None else json.loads(contenido)
+
+# Escritores disponibles por extensión del archivo de salida y librería requerida
+ESCRITORES_SALIDA = {
+    ".parquet": (escribir_parquet, "pyarrow"),
+    ".feather": (escribir_feather, "pyarrow"),
+    ".arrow": (escribir_feather, "pyarrow"),
+    ".csv": (escribir_csv, None),
+    ".csv.gz": (escribir_csv, None),
+    ".csv.bz2": (escribir_csv, None),
+    ".csv.xz": (escribir_csv, None),
+    ".csv.zst": (escribir_csv, "zstandard"),
+    ".xlsx": (escribir_excel, "openpyxl"),
+}
+
+def obtener_escritor_por_bloques(ruta):
+    """
+    Comprueba que el formato de salida admite la escritura por bloques
+
+    Returns:
+        Función escritor(dataset, ruta, parametros=None) del formato
+
+    Raises:
+        ValueError: Si el formato no está soportado o es Excel
+    """
+    escritor = obtener_escritor_salida(ruta)
+    if escritor is escribir_excel:
+        raise ValueError(f"La salida por bloques no admite Excel ({ruta}); "
+                         "use .parquet, .feather o .csv")
+    return escritor
+
+class EscritorPorBloques:
+    """
+    Escribe el dataset final bloque a bloque en un único archivo de salida
 
-# Asignar nombres de columnas
-matriz_descriptores_estadisticos.columns = [nombres_columnas_finales]
+    Los CSV se amplían en modo append y son legibles durante la ejecución;
+    Parquet añade un row group por bloque y Feather/Arrow un record batch,
+    ambos legibles una vez cerrado el archivo. Todos los bloques se ajustan
+    a las columnas y tipos del primero: las columnas de objetos de Python
+    (texto, None) se escriben como texto nullable, y un bloque con columnas
+    que no estaban en el primero o cuyos valores no admiten esos tipos es un
+    error.
 
-print(f"Matriz de descriptores estadísticos 3D: {matriz_descriptores_estadisticos.shape}")
+    Args:
+        ruta: Ruta del archivo de salida (.parquet, .feather/.arrow o .csv[.*])
+        parametros: Parámetros de la ejecución que se registran con los
+            resultados (None para no registrarlos)
+    """
+
+    def __init__(self, ruta, parametros=None):
+        self.ruta = ruta
+        self.formato = obtener_escritor_por_bloques(ruta)
+        self.parametros = parametros
+        self.columnas = None
+        self._esquema = None
+        self._escritor_arrow = None
+        self.filas_escritas = 0
+
+        # Un archivo previo con el mismo nombre se reemplaza
+        if os.path.exists(ruta):
+            os.remove(ruta)
+        if self.formato is escribir_csv:
+            guardar_parametros_adjuntos(ruta, parametros)
+
+    def escribir(self, bloque):
+        """
+        Añade un bloque al archivo de salida
+
+        Raises:
+            ValueError: Si el bloque tiene columnas que no estaban en el primero
+                o valores que no admiten los tipos de sus columnas
+        """
+        if self.columnas is None:
+            self.columnas = list(bloque.columns)
+        nuevas = [columna for columna in bloque.columns if columna not in self.columnas]
+        if nuevas:
+            raise ValueError(f"Columnas ausentes en el primer bloque de {self.ruta}: "
+                             f"{', '.join(map(str, nuevas))}; use un tamaño de bloque mayor "
+                             "o el pipeline en memoria")
+        bloque = bloque.reindex(columns=self.columnas).reset_index(drop=True)
+        objetos = bloque.columns[bloque.dtypes == object]
+        bloque[objetos] = bloque[objetos].astype("string")
+
+        if self.formato is escribir_csv:
+            bloque.to_csv(self.ruta, index=False, compression="infer", mode="a",
+                          header=self.filas_escritas == 0)
+        else:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            if self._esquema is not None:
+                # Columnas de texto que en este bloque llegan con otro tipo
+                # (por ejemplo, sólo valores faltantes)
+                for campo in self._esquema:
+                    if pa.types.is_string(campo.type) and bloque[campo.name].dtype != "string":
+                        bloque[campo.name] = bloque[campo.name].astype("string")
+            try:
+                tabla = pa.Table.from_pandas(bloque, schema=self._esquema, preserve_index=False)
+            except (pa.ArrowInvalid, pa.ArrowTypeError) as error:
+                raise ValueError(f"Un bloque no admite los tipos de columna del primero "
+                                 f"en {self.ruta}: {error}") from error
+            if self._escritor_arrow is None:
+                self._esquema = esquema_con_parametros(tabla.schema, self.parametros)
+                if self.formato is escribir_parquet:
+                    self._escritor_arrow = pq.ParquetWriter(self.ruta, self._esquema)
+                else:
+                    self._escritor_arrow = pa.ipc.new_file(self.ruta, self._esquema)
+            self._escritor_arrow.write_table(tabla)
+
+        self.filas_escritas += len(bloque)
+
+    def cerrar(self):
+        if self._escritor_arrow is not None:
+            self._escritor_arrow.close()
+            self._escritor_arrow = None
+
+def obtener_escritor_salida(ruta):
+    """
+    Selecciona el escritor de resultados según la extensión del archivo
+
+    Args:
+        ruta: Ruta del archivo de salida
+
+    Returns:
+        Función escritor(dataset, ruta, parametros=None)
+
+    Raises:
+        ValueError: Si la extensión no está soportada
+        ImportError: Si falta la librería que requiere el formato
+    """
+    # Probar primero las extensiones más largas (.csv.gz antes que .csv)
+    for extension in sorted(ESCRITORES_SALIDA, key=len, reverse=True):
+        if ruta.lower().endswith(extension):
+            escritor, libreria = ESCRITORES_SALIDA[extension]
+            if libreria is not None and importlib.util.find_spec(libreria) is None:
+                raise ImportError(f"El formato {extension} requiere la librería '{libreria}'")
+            return escritor
+
+    raise ValueError(f"Formato de salida no soportado: {ruta} "
+                     f"(extensiones válidas: {', '.join(ESCRITORES_SALIDA)})")
 
 # ----------------------------------------------------------------------------
-# CÁLCULO DE DESCRIPTORES 2D COMPLEMENTARIOS
+# PUNTOS DE CONTROL (CHECKPOINT) DE UNIDADES COMPLETADAS
 # ----------------------------------------------------------------------------
 
-print("\n=== CALCULANDO DESCRIPTORES 2D COMPLEMENTARIOS ===")
+def array_a_bytes(datos):
+    # Formato .npy: conserva tipo y forma del array
+    buffer = io.BytesIO()
+    np.save(buffer, datos)
+    return buffer.getvalue()
 
-# Usar moléculas originales sin conformación 3D
-moleculas_2d = moleculas_para_conformaciones
+def array_desde_bytes(contenido):
+    return np.load(io.BytesIO(contenido))
 
-# Crear calculador para descriptores 2D
-calculador_2d = Calculator(descriptors, ignore_3D=True)
+class AlmacenCheckpoint:
+    """
+    Almacén SQLite local con los resultados de cada unidad completada
+    (molécula, método): los valores [iteración, descriptor] o, en modo
+    streaming, las estadísticas [estadística, descriptor]. Cada unidad se
+    confirma en cuanto termina, por lo que una interrupción sólo pierde las
+    unidades en curso. Varios procesos pueden escribir a la vez (modo WAL).
 
-# Calcular descriptores 2D
-matriz_descriptores_2d = calculador_2d.pandas(moleculas_2d)
+    Args:
+        ruta: Ruta del archivo SQLite
+    """
 
-print(f"Descriptores 2D calculados: {matriz_descriptores_2d.shape}")
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self.conexion = sqlite3.connect(ruta, timeout=60)
+        self.conexion.execute("PRAGMA journal_mode=WAL")
+        self.conexion.execute("CREATE TABLE IF NOT EXISTS parametros "
+                              "(nombre TEXT PRIMARY KEY, valor TEXT)")
+        self.conexion.execute("CREATE TABLE IF NOT EXISTS unidades "
+                              "(molecula INTEGER, metodo TEXT, smiles TEXT, datos BLOB, "
+                              "PRIMARY KEY (molecula, metodo))")
+        self.conexion.commit()
+
+    def verificar_parametros(self, parametros):
+        """
+        Registra los parámetros de la ejecución o comprueba que coinciden con
+        los de la ejecución que se reanuda
+
+        Raises:
+            ValueError: Si el checkpoint pertenece a una configuración distinta
+        """
+        guardados = dict(self.conexion.execute("SELECT nombre, valor FROM parametros"))
+        for nombre, valor in parametros.items():
+            if nombre in guardados and guardados[nombre] != str(valor):
+                raise ValueError(f"El checkpoint {self.ruta} se creó con {nombre}="
+                                 f"{guardados[nombre]} y la ejecución actual usa {valor}")
+        self.conexion.executemany("INSERT OR REPLACE INTO parametros VALUES (?, ?)",
+                                  [(nombre, str(valor)) for nombre, valor in parametros.items()])
+        self.conexion.commit()
+
+    def leer(self, indice_molecula, metodo, smiles):
+        """
+        Devuelve el array guardado de la unidad, o None si no está completada
+        (o si la molécula de esa fila ha cambiado)
+        """
+        fila = self.conexion.execute("SELECT smiles, datos FROM unidades "
+                                     "WHERE molecula = ? AND metodo = ?",
+                                     (int(indice_molecula), metodo)).fetchone()
+        if fila is None or fila[0] != smiles:
+            return None
+        return array_desde_bytes(fila[1])
+
+    def guardar(self, indice_molecula, metodo, smiles, datos):
+        self.conexion.execute("INSERT OR REPLACE INTO unidades VALUES (?, ?, ?, ?)",
+                              (int(indice_molecula), metodo, smiles, array_a_bytes(datos)))
+        self.conexion.commit()
+
+    def unidades_completadas(self):
+        return self.conexion.execute("SELECT COUNT(*) FROM unidades").fetchone()[0]
+
+    def cerrar(self):
+        self.conexion.close()
+
+def eliminar_checkpoint(ruta):
+    # El modo WAL mantiene dos archivos auxiliares junto a la base de datos
+    for sufijo in ("", "-wal", "-shm"):
+        if os.path.exists(ruta + sufijo):
+            os.remove(ruta + sufijo)
+
+def preparar_checkpoint(ruta, parametros, reanudar, sobrescribir=False):
+    """
+    Crea el almacén de checkpoint de la ejecución o abre el existente al reanudar
+
+    Args:
+        ruta: Ruta del archivo SQLite
+        parametros: Diccionario de parámetros que deben coincidir al reanudar
+        reanudar: Si es True, se continúa el checkpoint existente
+        sobrescribir: Si es True, se descarta un checkpoint previo con la misma
+            ruta; si no, un checkpoint previo sólo puede reanudarse
+
+    Returns:
+        Número de unidades ya completadas
+
+    Raises:
+        FileNotFoundError: Si se pide reanudar y el checkpoint no existe
+        FileExistsError: Si ya existe un checkpoint y no se reanuda ni se
+            permite sobrescribirlo
+    """
+    existe = os.path.exists(ruta)
+    if reanudar and not existe:
+        raise FileNotFoundError(f"No existe el checkpoint {ruta} que se quiere reanudar")
+    if existe and not reanudar:
+        if not sobrescribir:
+            raise FileExistsError(f"Ya existe el checkpoint {ruta} de una ejecución no "
+                                  f"terminada; use --resume para reanudarla o "
+                                  f"--sobrescribir-checkpoint para descartarla")
+        eliminar_checkpoint(ruta)
+
+    almacen = AlmacenCheckpoint(ruta)
+    try:
+        almacen.verificar_parametros(parametros)
+        return almacen.unidades_completadas()
+    finally:
+        almacen.cerrar()
 
 # ----------------------------------------------------------------------------
-# COMBINACIÓN Y LIMPIEZA DE DATOS FINALES
+# CACHÉ PERSISTENTE DE DESCRIPTORES DIRECCIONADA POR CONTENIDO
 # ----------------------------------------------------------------------------
 
-print("\n=== COMBINANDO Y LIMPIANDO DATOS FINALES ===")
+class CacheDescriptores:
+    """
+    Caché SQLite de descriptores compartida entre ejecuciones. Cada entrada se
+    identifica por el hash de su contenido lógico: SMILES canónico, tipo de
+    resultado, método de conformación, semilla, número de iteraciones, lista de
+    descriptores y versiones de RDKit y Mordred; al cambiar cualquiera de ellos
+    la entrada deja de coincidir y se recalcula.
 
-# Combinar descriptores 2D y estadísticas 3D
-matriz_completa_descriptores = pd.concat([matriz_descriptores_2d, matriz_descriptores_estadisticos], axis=1)
+    Args:
+        ruta: Ruta del archivo SQLite
+    """
 
-print(f"Matriz completa de descriptores: {matriz_completa_descriptores.shape}")
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self.conexion = sqlite3.connect(ruta, timeout=60)
+        self.conexion.execute("PRAGMA journal_mode=WAL")
+        self.conexion.execute("CREATE TABLE IF NOT EXISTS descriptores "
+                              "(clave TEXT PRIMARY KEY, datos BLOB)")
+        self.conexion.commit()
+
+    @staticmethod
+    def clave(**componentes):
+        """
+        Calcula la clave de una entrada a partir de sus componentes
+
+        Returns:
+            Hash SHA-256 hexadecimal
+        """
+        componentes["rdkit"] = rdBase.rdkitVersion
+        componentes["mordred"] = mordred.__version__
+        contenido = json.dumps(componentes, sort_keys=True)
+        return hashlib.sha256(contenido.encode()).hexdigest()
+
+    def leer(self, clave):
+        fila = self.conexion.execute("SELECT datos FROM descriptores WHERE clave = ?",
+                                     (clave,)).fetchone()
+        return None if fila is None else array_desde_bytes(fila[0])
+
+    def guardar(self, clave, datos):
+        self.conexion.execute("INSERT OR REPLACE INTO descriptores VALUES (?, ?)",
+                              (clave, array_a_bytes(datos)))
+        self.conexion.commit()
+
+    def cerrar(self):
+        self.conexion.close()
+
+def clave_descriptores_3d(smiles, metodo, semilla_maestra, numero_iteraciones,
+                          estadisticas_streaming, nombres_descriptores,
+                          max_iteraciones_embebido=0, puntos_superficie=None,
+                          solo_estadisticas=False):
+    if estadisticas_streaming:
+        tipo = "estadisticas_3d"
+    else:
+        tipo = "estadisticas_exactas_3d" if solo_estadisticas else "valores_3d"
+    return CacheDescriptores.clave(tipo=tipo, smiles=smiles, metodo=metodo,
+                                   semilla=semilla_maestra, iteraciones=numero_iteraciones,
+                                   max_iteraciones_embebido=max_iteraciones_embebido,
+                                   descriptores=nombres_descriptores,
+                                   nativos=VERSION_DESCRIPTORES_NATIVOS,
+                                   puntos_superficie=puntos_superficie)
+
+def clave_descriptores_2d(smiles, nombres_descriptores):
+    return CacheDescriptores.clave(tipo="valores_2d", smiles=smiles,
+                                   descriptores=nombres_descriptores)
 
-# Convertir a string para identificar valores no numéricos
-matriz_limpieza = matriz_completa_descriptores.astype(str)
+# ----------------------------------------------------------------------------
+# MODO INCREMENTAL
+# ----------------------------------------------------------------------------
+
+# Lectores de una salida previa según el escritor que la generó; los CSV se
+# interpretan con precisión de ida y vuelta para recuperar los float exactos
+LECTORES_SALIDA_PREVIA = {
+    escribir_parquet: pd.read_parquet,
+    escribir_feather: pd.read_feather,
+    escribir_csv: functools.partial(pd.read_csv, float_precision="round_trip"),
+    escribir_excel: pd.read_excel,
+}
+
+def columnas_salida(ruta):
+    """
+    Nombres de las columnas de un archivo de resultados, leídos de su
+    cabecera o esquema sin cargar los datos
+    """
+    escritor = obtener_escritor_salida(ruta)
+    if escritor is escribir_parquet:
+        import pyarrow.parquet as pq
+        return list(pq.read_schema(ruta).names)
+    if escritor is escribir_feather:
+        import pyarrow as pa
+        with pa.memory_map(ruta) as fuente:
+            return list(pa.ipc.open_file(fuente).schema.names)
+    if escritor is escribir_csv:
+        return list(pd.read_csv(ruta, nrows=0, compression="infer").columns)
+    return list(pd.read_excel(ruta, nrows=0).columns)
+
+def unidades_con_filas(tamanos, filas):
+    """
+    Selecciona las unidades de lectura (row groups o record batches) que
+    contienen alguna de las filas pedidas
+
+    Args:
+        tamanos: Número de filas de cada unidad, en orden
+        filas: Posiciones de las filas pedidas (None para todas)
+
+    Returns:
+        Lista de tuplas (indice_unidad, posición de su primera fila)
+    """
+    inicios = np.concatenate([[0], np.cumsum(tamanos, dtype=np.int64)])
+    unidades = (range(len(tamanos)) if filas is None
+                else np.unique(np.searchsorted(inicios, filas, side="right") - 1))
+    return [(int(unidad), int(inicios[unidad])) for unidad in unidades]
+
+def columnas_como_texto(bloque, texto):
+    # Las columnas indicadas pasan a texto nullable (string de pandas)
+    texto = [columna for columna in texto if columna in bloque.columns]
+    bloque[texto] = bloque[texto].astype("string")
+    return bloque
+
+def recorrer_salida(ruta, tamano_bloque, columnas=None, filas=None, texto=()):
+    """
+    Recorre un archivo de resultados por bloques sin cargarlo completo: Parquet
+    por row groups y CSV de forma incremental, Feather/Arrow por record batches
+    de un archivo mapeado en memoria y Excel completo
+
+    Args:
+        ruta: Archivo de resultados
+        tamano_bloque: Filas máximas por bloque de Parquet y CSV
+        columnas: Columnas a leer (None para todas)
+        filas: Posiciones de las filas que interesan (None para todas); se
+            omiten los row groups y record batches sin ninguna de ellas y la
+            lectura termina tras la última
+        texto: Columnas que se leen como texto, con el mismo tipo en todos
+            los bloques
+
+    Yields:
+        Tuplas (posición de la primera fila del bloque, bloque)
+    """
+    for inicio, bloque in _recorrer_salida(ruta, tamano_bloque, columnas, filas, texto):
+        yield inicio, columnas_como_texto(bloque, texto)
+
+def _recorrer_salida(ruta, tamano_bloque, columnas, filas, texto):
+    escritor = obtener_escritor_salida(ruta)
+    if escritor is escribir_parquet:
+        import pyarrow.parquet as pq
+        archivo = pq.ParquetFile(ruta)
+        tamanos = [archivo.metadata.row_group(grupo).num_rows
+                   for grupo in range(archivo.metadata.num_row_groups)]
+        for grupo, inicio in unidades_con_filas(tamanos, filas):
+            for lote in archivo.iter_batches(batch_size=tamano_bloque, row_groups=[grupo],
+                                             columns=columnas):
+                yield inicio, lote.to_pandas()
+                inicio += lote.num_rows
+    elif escritor is escribir_feather:
+        import pyarrow as pa
+        with pa.memory_map(ruta) as fuente:
+            lector = pa.ipc.open_file(fuente)
+            tamanos = [lector.get_batch(lote).num_rows for lote in range(lector.num_record_batches)]
+            for lote, inicio in unidades_con_filas(tamanos, filas):
+                datos = lector.get_batch(lote)
+                yield inicio, (datos if columnas is None else datos.select(columnas)).to_pandas()
+    elif escritor is escribir_csv:
+        ultima = np.inf if filas is None else max(filas, default=-1)
+        inicio = 0
+        for bloque in pd.read_csv(ruta, usecols=columnas, chunksize=tamano_bloque,
+                                  compression="infer", float_precision="round_trip",
+                                  dtype={columna: str for columna in texto}):
+            if inicio > ultima:
+                break
+            yield inicio, bloque
+            inicio += len(bloque)
+    else:
+        yield 0, pd.read_excel(ruta, usecols=columnas)
+
+class SalidaPrevia:
+    """
+    Resultados de una ejecución anterior indexados por SMILES canónico, para
+    reutilizar las filas de las moléculas que no han cambiado. Al abrirla sólo
+    se leen los SMILES y los motivos de fallo; las características de las
+    filas reutilizadas se leen del archivo cuando se piden, por bloques
 
-# Identificar celdas con texto (valores problemáticos)
-mascara_texto = matriz_limpieza.apply(lambda columna: columna.str.contains('[a-zA-Z]', na=True))
+    Args:
+        ruta: Archivo de salida de la ejecución anterior
+        columna_smiles: Columna con los SMILES de cada fila
+        tamano_bloque: Filas leídas por paso del archivo previo
+        parametros: Parámetros de la ejecución actual, que deben coincidir con
+            los registrados en la salida previa (None para no comprobarlos)
+
+    Raises:
+        ValueError: Si la salida previa no registra sus parámetros, se generó
+            con otros o no contiene la columna de SMILES
+    """
 
-# Eliminar filas/columnas con valores no numéricos
-matriz_numerica = matriz_limpieza[~mascara_texto]
+    def __init__(self, ruta, columna_smiles, tamano_bloque=TAMANO_BLOQUE_ENTRADA,
+                 parametros=None):
+        self.ruta = ruta
+        self.tamano_bloque = tamano_bloque
+        if parametros is not None:
+            previos = parametros_salida(ruta)
+            if previos is None:
+                raise ValueError(f"La salida previa {ruta} no registra los parámetros de su "
+                                 "ejecución y sus filas no pueden reutilizarse")
+            # Comparar tras serializar, como están guardados
+            for nombre, valor in json.loads(json.dumps(parametros)).items():
+                if previos.get(nombre) != valor:
+                    raise ValueError(f"La salida previa {ruta} se generó con {nombre}="
+                                     f"{previos.get(nombre)} y la ejecución actual usa {valor}")
+        self.columnas = set(columnas_salida(ruta))
+        if columna_smiles not in self.columnas:
+            raise ValueError(f"La salida previa {ruta} no contiene la columna {columna_smiles}")
+
+        identidad = [columna_smiles] + ([COLUMNA_FALLOS] if COLUMNA_FALLOS in self.columnas
+                                        else [])
+        bloques = [bloque for _, bloque in recorrer_salida(ruta, tamano_bloque, identidad)]
+        datos = (pd.concat(bloques, ignore_index=True) if bloques
+                 else pd.DataFrame(columns=identidad))
+
+        # Las filas con unidades fallidas (límite de tiempo) se vuelven a calcular
+        completas = np.ones(len(datos), dtype=bool)
+        if COLUMNA_FALLOS in datos.columns:
+            completas = datos[COLUMNA_FALLOS].fillna("").astype(str).eq("").to_numpy()
+
+        # Primera fila completa de cada SMILES canónico
+        self.filas = {}
+        for posicion, smiles in enumerate(datos[columna_smiles]):
+            molecula = Chem.MolFromSmiles(smiles) if isinstance(smiles, str) else None
+            if molecula is not None and completas[posicion]:
+                self.filas.setdefault(Chem.MolToSmiles(molecula), posicion)
+
+    def buscar(self, moleculas):
+        """
+        Devuelve, por cada molécula, su fila en la salida previa o None si no
+        figura en ella (molécula nueva o con SMILES modificado)
+        """
+        return [self.filas.get(Chem.MolToSmiles(molecula)) if molecula is not None else None
+                for molecula in moleculas]
+
+    def caracteristicas(self, filas, columnas):
+        """
+        Extrae las columnas de características de las filas indicadas,
+        recorriendo el archivo previo por bloques
+
+        Raises:
+            ValueError: Si la salida previa no tiene todas las columnas
+        """
+        faltantes = [columna for columna in columnas if columna not in self.columnas]
+        if faltantes:
+            raise ValueError(f"La salida previa no contiene {len(faltantes)} columnas de la "
+                             f"ejecución actual (p. ej. {faltantes[0]}); ejecute sin --incremental")
+
+        filas = np.asarray(filas, dtype=np.intp)
+        valores = np.full((len(filas), len(columnas)), np.nan)
+        for inicio, bloque in recorrer_salida(self.ruta, self.tamano_bloque, columnas, filas):
+            en_bloque = np.flatnonzero((filas >= inicio) & (filas < inicio + len(bloque)))
+            valores[en_bloque] = bloque[columnas].iloc[filas[en_bloque] - inicio].to_numpy(
+                dtype=np.float64)
+        return valores
+
+def fusionar_con_salida_previa(matriz_calculada, filas_previas, salida_previa):
+    """
+    Completa la matriz de características con las filas reutilizadas de la
+    salida previa, respetando el orden de la entrada actual
 
-# Convertir de vuelta a numérico
-matriz_numerica = matriz_numerica.astype(float)
+    Args:
+        matriz_calculada: DataFrame con las filas calculadas, en orden de entrada
+        filas_previas: Fila en la salida previa de cada molécula de la entrada
+            (None para las que se han calculado)
+        salida_previa: SalidaPrevia de la que se toman las filas reutilizadas
 
-# Rellenar valores faltantes con "NA"
-matriz_numerica = matriz_numerica.fillna("NA")
+    Returns:
+        DataFrame con una fila por molécula de la entrada
+    """
+    columnas = [str(columna) for columna in matriz_calculada.columns]
+    filas_calculadas = [fila for fila, previa in enumerate(filas_previas) if previa is None]
+    filas_reutilizadas = [fila for fila, previa in enumerate(filas_previas) if previa is not None]
 
-print(f"Matriz después de limpieza: {matriz_numerica.shape}")
+    matriz = np.full((len(filas_previas), len(columnas)), np.nan)
+    matriz[filas_calculadas] = matriz_calculada.to_numpy(dtype=np.float64)
+    if filas_reutilizadas:
+        matriz[filas_reutilizadas] = salida_previa.caracteristicas(
+            [filas_previas[fila] for fila in filas_reutilizadas], columnas)
+
+    return pd.DataFrame(matriz, columns=columnas).astype(
+        dict(zip(columnas, matriz_calculada.dtypes)))
 
 # ----------------------------------------------------------------------------
-# COMBINACIÓN CON DATOS ORIGINALES Y EXPORTACIÓN
+# PLANIFICACIÓN POR COSTE ESTIMADO
 # ----------------------------------------------------------------------------
 
-print("\n=== EXPORTANDO RESULTADOS FINALES ===")
+# Características del modelo de coste de una molécula
+CARACTERISTICAS_COSTO = ["atomos_pesados", "anillos", "exceso_macrociclo", "enlaces_rotables"]
+
+# Coeficientes del modelo log-lineal:
+# log(segundos) = c0 + c1·log(1 + átomos pesados) + c2·anillos
+#                 + c3·(tamaño del mayor anillo - 8, si es positivo) + c4·enlaces rotables
+COEFICIENTES_COSTO = np.array([0.0, 2.0, 0.1, 0.05, 0.15])
+
+def caracteristicas_costo(molecula):
+    """
+    Extrae las características que determinan el coste de embebido y de los
+    descriptores de superficie de una molécula
+
+    Returns:
+        Array [átomos pesados, anillos, exceso de macrociclo, enlaces rotables]
+    """
+    if molecula is None:
+        return np.zeros(len(CARACTERISTICAS_COSTO))
+    anillos = molecula.GetRingInfo().AtomRings()
+    mayor_anillo = max((len(anillo) for anillo in anillos), default=0)
+    return np.array([molecula.GetNumHeavyAtoms(),
+                     len(anillos),
+                     max(0, mayor_anillo - 8),
+                     rdMolDescriptors.CalcNumRotatableBonds(molecula)], dtype=np.float64)
+
+def matriz_diseno_costo(caracteristicas):
+    # Columnas [1, log(1 + átomos pesados), anillos, exceso de macrociclo, enlaces rotables]
+    return np.column_stack([np.ones(len(caracteristicas)),
+                            np.log1p(caracteristicas[:, 0]),
+                            caracteristicas[:, 1:]])
+
+def estimar_costos(moleculas, coeficientes=COEFICIENTES_COSTO):
+    """
+    Estima el coste relativo de procesar cada molécula
+
+    Args:
+        moleculas: Lista de moléculas RDKit (None si no es válida)
+        coeficientes: Coeficientes del modelo de coste
+
+    Returns:
+        Tupla (caracteristicas [molécula, característica], costos [molécula]);
+        las moléculas no válidas tienen coste 0
+    """
+    caracteristicas = np.array([caracteristicas_costo(molecula) for molecula in moleculas],
+                               dtype=np.float64).reshape(len(moleculas), len(CARACTERISTICAS_COSTO))
+    costos = np.exp(matriz_diseno_costo(caracteristicas) @ coeficientes)
+    costos[[molecula is None for molecula in moleculas]] = 0.0
+    return caracteristicas, costos
+
+def ordenar_por_costo(costos):
+    # Las moléculas más costosas primero; a igual coste se respeta el orden de entrada
+    return np.argsort(-np.asarray(costos), kind="stable")
+
+def ajustar_modelo_costo(ruta_tiempos):
+    """
+    Reajusta los coeficientes del modelo de coste con los tiempos medidos en
+    una ejecución anterior (archivo de --tiempos)
+
+    Args:
+        ruta_tiempos: Archivo de tiempos por molécula
+
+    Returns:
+        Coeficientes ajustados por mínimos cuadrados sobre log(segundos), o los
+        coeficientes por defecto si no hay suficientes mediciones
+    """
+    tiempos = LECTORES_SALIDA_PREVIA[obtener_escritor_salida(ruta_tiempos)](ruta_tiempos)
+    tiempos = tiempos[(tiempos["segundos"] > 0) & tiempos["smiles"].notna()]
+    if len(tiempos) < 2 * len(COEFICIENTES_COSTO):
+        print(f"Modelo de coste: {len(tiempos)} mediciones insuficientes; "
+              f"se usan los coeficientes por defecto")
+        return COEFICIENTES_COSTO
+
+    diseno = matriz_diseno_costo(tiempos[CARACTERISTICAS_COSTO].to_numpy(dtype=np.float64))
+    coeficientes, *_ = np.linalg.lstsq(diseno, np.log(tiempos["segundos"].to_numpy()),
+                                       rcond=None)
+    print(f"Modelo de coste ajustado con {len(tiempos)} mediciones: "
+          f"{np.round(coeficientes, 3).tolist()}")
+    return coeficientes
+
+def tabla_tiempos(moleculas, caracteristicas, costos, segundos):
+    """
+    Construye la tabla de tiempos medidos por molécula para reajustar el modelo
+    """
+    tabla = pd.DataFrame(caracteristicas, columns=CARACTERISTICAS_COSTO)
+    tabla.insert(0, "smiles", [Chem.MolToSmiles(molecula) if molecula is not None else None
+                               for molecula in moleculas])
+    tabla["costo_estimado"] = costos
+    tabla["segundos"] = segundos
+    return tabla
+
+def cronometrar(funcion, tarea):
+    """
+    Ejecuta una tarea y añade a su resultado el tiempo de reloj empleado
+    """
+    inicio = time.perf_counter()
+    resultado = funcion(tarea)
+    return (*resultado, time.perf_counter() - inicio)
+
+# ----------------------------------------------------------------------------
+# EJECUCIÓN PARALELA POR MOLÉCULA
+# ----------------------------------------------------------------------------
+
+# Motor de descriptores 3D de cada proceso (se construye una sola vez por proceso)
+_motor_3d_proceso = None
+
+def obtener_motor_3d():
+    """
+    Devuelve el motor de descriptores 3D del proceso actual, creándolo si es
+    necesario
+    """
+    global _motor_3d_proceso
+    if _motor_3d_proceso is None:
+        _motor_3d_proceso = MotorDescriptores3D(crear_calculador_3d())
+    return _motor_3d_proceso
+
+# Almacén de checkpoint de cada proceso (una conexión SQLite por proceso)
+_almacen_checkpoint_proceso = None
+
+def obtener_almacen_checkpoint(ruta):
+    """
+    Devuelve el almacén de checkpoint del proceso actual, o None si la
+    ejecución no usa checkpoint
+    """
+    global _almacen_checkpoint_proceso
+    if ruta is None:
+        return None
+    if _almacen_checkpoint_proceso is None or _almacen_checkpoint_proceso.ruta != ruta:
+        _almacen_checkpoint_proceso = AlmacenCheckpoint(ruta)
+    return _almacen_checkpoint_proceso
+
+def finalizar_checkpoint(ruta):
+    """
+    Elimina el checkpoint de una ejecución terminada, cerrando antes la
+    conexión del proceso actual si la tiene abierta
+    """
+    global _almacen_checkpoint_proceso
+    if ruta is None:
+        return
+    if _almacen_checkpoint_proceso is not None and _almacen_checkpoint_proceso.ruta == ruta:
+        _almacen_checkpoint_proceso.cerrar()
+        _almacen_checkpoint_proceso = None
+    eliminar_checkpoint(ruta)
+
+# Caché de descriptores de cada proceso
+_cache_descriptores_proceso = None
+
+def obtener_cache_descriptores(ruta):
+    """
+    Devuelve la caché de descriptores del proceso actual, o None si la
+    ejecución no usa caché
+    """
+    global _cache_descriptores_proceso
+    if ruta is None:
+        return None
+    if _cache_descriptores_proceso is None or _cache_descriptores_proceso.ruta != ruta:
+        _cache_descriptores_proceso = CacheDescriptores(ruta)
+    return _cache_descriptores_proceso
+
+def procesar_molecula(tarea, numero_iteraciones, estadisticas_streaming=False,
+                      devolver_valores=True, ruta_checkpoint=None, ruta_cache=None,
+                      semilla_maestra=SEMILLA_ALEATORIA, max_iteraciones_embebido=0,
+                      metodos=None, puntos_superficie=None):
+    """
+    Ejecuta el pipeline completo de una molécula: embebido, optimización,
+    descriptores 3D y estadísticas de distribución
+
+    Args:
+        tarea: Tupla (indice_molecula, molecula)
+        numero_iteraciones: Número de conformaciones por método
+        estadisticas_streaming: Si es True, las estadísticas se acumulan
+            conformación a conformación y no se conservan los valores
+        devolver_valores: Si es False, sólo se devuelven las estadísticas, y
+            son también lo único que se guarda en el checkpoint y la caché
+        ruta_checkpoint: Almacén SQLite donde se guarda cada método completado y
+            del que se recuperan los ya calculados (None para no usarlo)
+        ruta_cache: Caché persistente de descriptores compartida entre
+            ejecuciones (None para no usarla); no se usa con SEMILLA_ALEATORIA
+        semilla_maestra: Semilla de la ejecución de la que se derivan las de cada
+            unidad (molécula, método)
+        max_iteraciones_embebido: Límite de iteraciones de cada embebido
+            (0 = valor por defecto de RDKit)
+        metodos: Métodos a calcular (por defecto, todos); el resto queda como NaN
+        puntos_superficie: Puntos por átomo del cálculo de áreas de los
+            descriptores CPSA (None para la malla de Mordred)
+
+    Returns:
+        Tupla (indice_molecula, valores_molecula, estadisticas_molecula), con
+        arrays [método, iteración, descriptor] y [método, estadística, descriptor];
+        valores_molecula es None en modo streaming o si no se solicitan
+    """
+    indice_molecula, molecula = tarea
+    motor = obtener_motor_3d()
+    nombres_descriptores = motor.nombres
+    solo_estadisticas = estadisticas_streaming or not devolver_valores
+
+    # Las estructuras no válidas conservan su fila con valores faltantes
+    if molecula is None:
+        estadisticas_molecula = np.full((len(METODOS_CONFORMACION), len(ESTADISTICAS_DISTRIBUCION),
+                                         len(nombres_descriptores)), np.nan)
+        valores_molecula = None if solo_estadisticas else np.full(
+            (len(METODOS_CONFORMACION), numero_iteraciones, len(nombres_descriptores)), np.nan)
+        return indice_molecula, valores_molecula, estadisticas_molecula
+
+    # Recuperar del checkpoint o de la caché las unidades (molécula, método) ya
+    # completadas
+    almacen = obtener_almacen_checkpoint(ruta_checkpoint)
+    # Sin semilla fija cada ejecución genera conformaciones distintas y la
+    # caché repetiría las de la primera
+    cache = (obtener_cache_descriptores(ruta_cache)
+             if semilla_maestra != SEMILLA_ALEATORIA else None)
+    smiles = Chem.MolToSmiles(molecula) if almacen is not None or cache is not None else None
+    claves_cache = {metodo: clave_descriptores_3d(smiles, metodo, semilla_maestra,
+                                                  numero_iteraciones, estadisticas_streaming,
+                                                  nombres_descriptores, max_iteraciones_embebido,
+                                                  puntos_superficie, solo_estadisticas)
+                    for metodo, sufijo in METODOS_CONFORMACION} if cache is not None else {}
+    indices_metodos = {metodo: indice for indice, (metodo, sufijo)
+                       in enumerate(METODOS_CONFORMACION)}
+
+    # Por método: estadísticas si no se devuelven los valores, valores por iteración si no
+    filas_por_metodo = len(ESTADISTICAS_DISTRIBUCION) if solo_estadisticas else numero_iteraciones
+    resultados_metodos = np.full((len(METODOS_CONFORMACION), filas_por_metodo,
+                                  len(nombres_descriptores)), np.nan)
+    metodos_pendientes = []
+    for metodo, sufijo in METODOS_CONFORMACION:
+        if metodos is not None and metodo not in metodos:
+            continue
+        guardado = almacen.leer(indice_molecula, metodo, smiles) if almacen is not None else None
+        if guardado is None and cache is not None:
+            guardado = cache.leer(claves_cache[metodo])
+            if guardado is not None and almacen is not None:
+                almacen.guardar(indice_molecula, metodo, smiles, guardado)
+        if guardado is None:
+            metodos_pendientes.append(metodo)
+        else:
+            resultados_metodos[indices_metodos[metodo]] = guardado
+
+    if metodos_pendientes:
+        # Preparar la molécula una sola vez para todos los métodos e iteraciones
+        molecula_preparada = MoleculaPreparada(molecula)
+
+        # Los conjuntos de conformaciones se generan a medida que se consumen
+        conjuntos = generar_conjuntos_conformaciones(molecula_preparada, numero_iteraciones,
+                                                     metodos=metodos_pendientes,
+                                                     semilla_maestra=semilla_maestra,
+                                                     max_iteraciones_embebido=max_iteraciones_embebido)
+
+        for metodo, sufijo, molecula_metodo in conjuntos:
+            if estadisticas_streaming:
+                acumulador = AcumuladorEstadisticas(len(nombres_descriptores))
+                for valores_conformacion in iterar_descriptores_conformaciones(
+                        motor, molecula_metodo, puntos_superficie,
+                        molecula_preparada.propiedades_atomicas):
+                    acumulador.actualizar(valores_conformacion)
+                resultado_metodo = acumulador.estadisticas()
+            else:
+                resultado_metodo = calcular_descriptores_conformaciones(
+                    motor, molecula_metodo, numero_iteraciones, puntos_superficie,
+                    molecula_preparada.propiedades_atomicas)
+                if solo_estadisticas:
+                    resultado_metodo = calcular_estadisticas_distribucion(resultado_metodo, eje=0)
+
+            resultados_metodos[indices_metodos[metodo]] = resultado_metodo
+            if almacen is not None:
+                almacen.guardar(indice_molecula, metodo, smiles, resultado_metodo)
+            if cache is not None:
+                cache.guardar(claves_cache[metodo], resultado_metodo)
+
+    if solo_estadisticas:
+        return indice_molecula, None, resultados_metodos
+
+    valores_molecula = resultados_metodos
+
+    # Calcular estadísticas de distribución a lo largo de las iteraciones
+    estadisticas_molecula = calcular_estadisticas_distribucion(valores_molecula, eje=1)
+
+    return indice_molecula, valores_molecula, estadisticas_molecula
+
+def ejecutar_tareas(funcion, tareas, numero_trabajadores, pool=None):
+    """
+    Ejecuta una función sobre las tareas, en serie o en un pool de procesos,
+    entregando cada resultado en cuanto está disponible
+
+    Args:
+        funcion: Función a aplicar (debe poder serializarse con pickle)
+        tareas: Iterable de tareas
+        numero_trabajadores: Número de procesos (1 para ejecución en serie)
+        pool: Pool de procesos ya creado que se reutiliza entre llamadas
+
+    Returns:
+        Generador de resultados, en orden de finalización
+    """
+    # imap_unordered reparte las tareas de una en una: cada proceso toma la
+    # siguiente en cuanto queda libre, sin asignación estática por proceso
+    if pool is not None:
+        yield from pool.imap_unordered(funcion, tareas)
+        return
+
+    if numero_trabajadores <= 1:
+        yield from map(funcion, tareas)
+        return
+
+    with multiprocessing.Pool(numero_trabajadores) as pool:
+        yield from pool.imap_unordered(funcion, tareas)
+
+# ----------------------------------------------------------------------------
+# EJECUCIÓN AISLADA CON LÍMITE DE TIEMPO POR UNIDAD
+# ----------------------------------------------------------------------------
+
+# Columna con los motivos de fallo de las unidades 3D de cada molécula
+COLUMNA_FALLOS = "fallos_3d"
+
+def unidades_molecula():
+    """
+    Agrupa los métodos de conformación en unidades de trabajo independientes:
+    UFF y MMFF forman una sola unidad porque comparten el embebido DG
+
+    Returns:
+        Lista de tuplas de métodos
+    """
+    unidades = [(metodo,) for metodo, sufijo in METODOS_CONFORMACION
+                if metodo not in METODOS_CAMPO_FUERZA]
+    return unidades + [METODOS_CAMPO_FUERZA]
+
+def _bucle_trabajador_aislado(funcion, conexion):
+    # El motor 3D se construye antes de aceptar unidades, para que su
+    # creación no consuma el tiempo de la primera unidad
+    obtener_motor_3d()
+    conexion.send("listo")
+
+    # Proceso de trabajo: recibe (número, tarea) y devuelve (número, resultado, error)
+    while True:
+        mensaje = conexion.recv()
+        if mensaje is None:
+            break
+        numero_tarea, tarea = mensaje
+        try:
+            conexion.send((numero_tarea, funcion(tarea), None))
+        except Exception as error:
+            conexion.send((numero_tarea, None, f"{type(error).__name__}: {error}"))
+
+def _procesar_unidad(tarea, funcion):
+    # Ejecuta la función de molécula restringida a los métodos de la unidad
+    indice_molecula, molecula, metodos = tarea
+    return funcion((indice_molecula, molecula), metodos=metodos)
+
+class EjecutorConLimite:
+    """
+    Ejecuta unidades (molécula, métodos) en procesos propios que se terminan
+    si una unidad supera el tiempo máximo o si el proceso muere; en ambos
+    casos la unidad queda sin resultado, con el motivo del fallo, y el proceso
+    se reemplaza sin detener al resto. Cada proceso se comunica por su propio
+    Pipe, de modo que terminarlo no corrompe los canales de los demás.
+
+    Args:
+        funcion: Función de molécula (procesar_molecula parcialmente aplicada)
+        numero_trabajadores: Número de procesos
+        limite_segundos: Tiempo máximo de reloj por unidad
+        forma_valores: Forma [método, iteración, descriptor] de los valores de
+            una molécula, o None si la función no los devuelve
+        forma_estadisticas: Forma [método, estadística, descriptor]
+    """
+
+    def __init__(self, funcion, numero_trabajadores, limite_segundos, forma_valores,
+                 forma_estadisticas):
+        self.funcion = functools.partial(_procesar_unidad, funcion=funcion)
+        self.numero_trabajadores = max(1, numero_trabajadores)
+        self.limite_segundos = limite_segundos
+        self.forma_valores = forma_valores
+        self.forma_estadisticas = forma_estadisticas
+        self.trabajadores = []
+
+    def _lanzar(self):
+        conexion, conexion_trabajador = multiprocessing.Pipe()
+        proceso = multiprocessing.Process(target=_bucle_trabajador_aislado,
+                                          args=(self.funcion, conexion_trabajador), daemon=True)
+        proceso.start()
+        conexion_trabajador.close()
+        return {"proceso": proceso, "conexion": conexion, "listo": False, "numero": None,
+                "tarea": None, "inicio": None}
+
+    def _terminar(self, trabajador):
+        trabajador["proceso"].kill()
+        trabajador["proceso"].join()
+        trabajador["conexion"].close()
+
+    def ejecutar_unidades(self, tareas):
+        """
+        Reparte las unidades dinámicamente entre los procesos
+
+        Args:
+            tareas: Iterable de tuplas (indice_molecula, molecula, metodos)
+
+        Yields:
+            Tuplas (tarea, resultado o None, motivo del fallo o None, segundos)
+        """
+        pendientes = iter(tareas)
+        agotadas = False
+        numero_tarea = 0
+
+        def asignar(trabajador):
+            nonlocal numero_tarea, agotadas
+            tarea = None if agotadas else next(pendientes, None)
+            agotadas = tarea is None
+            trabajador["tarea"] = tarea
+            if tarea is not None:
+                numero_tarea += 1
+                trabajador["numero"] = numero_tarea
+                trabajador["inicio"] = time.perf_counter()
+                trabajador["conexion"].send((numero_tarea, tarea))
+
+        def esperando(trabajador):
+            # Ocupado con una unidad, o arrancando mientras queden unidades
+            return trabajador["tarea"] is not None or not (trabajador["listo"] or agotadas)
+
+        while len(self.trabajadores) < self.numero_trabajadores:
+            self.trabajadores.append(self._lanzar())
+        for trabajador in self.trabajadores:
+            if trabajador["listo"]:
+                asignar(trabajador)
+
+        while any(esperando(trabajador) for trabajador in self.trabajadores):
+            listos = multiprocessing.connection.wait(
+                [trabajador["conexion"] for trabajador in self.trabajadores
+                 if esperando(trabajador)], timeout=0.1)
+
+            for posicion, trabajador in enumerate(self.trabajadores):
+                if not esperando(trabajador):
+                    continue
+                tarea = trabajador["tarea"]
+
+                if trabajador["conexion"] in listos:
+                    try:
+                        mensaje = trabajador["conexion"].recv()
+                    except (EOFError, OSError):
+                        # El proceso murió (p. ej. por un fallo dentro de RDKit)
+                        self._terminar(trabajador)
+                        codigo = trabajador["proceso"].exitcode
+                        self.trabajadores[posicion] = self._lanzar()
+                        if tarea is not None:
+                            yield (tarea, None, f"proceso terminado (código {codigo})",
+                                   time.perf_counter() - trabajador["inicio"])
+                        continue
+
+                    if not trabajador["listo"]:
+                        trabajador["listo"] = True
+                        asignar(trabajador)
+                        continue
+
+                    numero, resultado, error = mensaje
+                    segundos = time.perf_counter() - trabajador["inicio"]
+                    asignar(trabajador)
+                    yield tarea, resultado, error, segundos
+
+                elif tarea is not None:
+                    segundos = time.perf_counter() - trabajador["inicio"]
+                    if segundos > self.limite_segundos:
+                        self._terminar(trabajador)
+                        self.trabajadores[posicion] = self._lanzar()
+                        yield tarea, None, f"tiempo agotado ({self.limite_segundos:g} s)", segundos
+
+    def ejecutar(self, tareas):
+        """
+        Divide cada molécula en unidades, las ejecuta con límite de tiempo y
+        reúne sus resultados por molécula
+
+        Args:
+            tareas: Iterable de tuplas (indice_molecula, molecula)
+
+        Yields:
+            Tuplas (indice_molecula, valores, estadisticas, segundos, fallos), con
+            NaN en los métodos de las unidades fallidas y la lista de sus motivos
+        """
+        unidades = unidades_molecula()
+        indices_metodos = {metodo: indice for indice, (metodo, sufijo)
+                           in enumerate(METODOS_CONFORMACION)}
+        en_curso = {}
+
+        def tareas_unidades():
+            for indice_molecula, molecula in tareas:
+                en_curso[indice_molecula] = {
+                    "valores": (None if self.forma_valores is None
+                                else np.full(self.forma_valores, np.nan)),
+                    "estadisticas": np.full(self.forma_estadisticas, np.nan),
+                    "pendientes": len(unidades), "segundos": 0.0, "fallos": []}
+                for metodos in unidades:
+                    yield indice_molecula, molecula, metodos
+
+        for (indice_molecula, molecula, metodos), resultado, error, segundos in \
+                self.ejecutar_unidades(tareas_unidades()):
+            molecula_en_curso = en_curso[indice_molecula]
+            molecula_en_curso["segundos"] += segundos
+            molecula_en_curso["pendientes"] -= 1
+
+            filas = [indices_metodos[metodo] for metodo in metodos]
+            if error is None:
+                _, valores_unidad, estadisticas_unidad = resultado
+                molecula_en_curso["estadisticas"][filas] = estadisticas_unidad[filas]
+                if molecula_en_curso["valores"] is not None:
+                    molecula_en_curso["valores"][filas] = valores_unidad[filas]
+            else:
+                molecula_en_curso["fallos"].append(f"{'+'.join(metodos)}: {error}")
+
+            if molecula_en_curso["pendientes"] == 0:
+                del en_curso[indice_molecula]
+                yield (indice_molecula, molecula_en_curso["valores"],
+                       molecula_en_curso["estadisticas"], molecula_en_curso["segundos"],
+                       molecula_en_curso["fallos"])
+
+    def cerrar(self):
+        for trabajador in self.trabajadores:
+            try:
+                trabajador["conexion"].send(None)
+            except OSError:
+                pass
+        for trabajador in self.trabajadores:
+            trabajador["proceso"].join(timeout=5)
+            if trabajador["proceso"].is_alive():
+                trabajador["proceso"].kill()
+            trabajador["conexion"].close()
+        self.trabajadores = []
+
+def columna_fallos(fallos_calculadas, filas_previas):
+    """
+    Motivos de fallo de cada fila de la entrada ("" si todas sus unidades
+    terminaron o si la fila se reutilizó de una salida previa)
+
+    Args:
+        fallos_calculadas: Lista de motivos por molécula calculada, en orden
+        filas_previas: Fila en la salida previa de cada molécula (None si se calculó)
+    """
+    fallos = iter(fallos_calculadas)
+    return ["; ".join(next(fallos)) if previa is None else "" for previa in filas_previas]
+
+def ejecutar_moleculas(tarea_molecula, tareas, numero_trabajadores, pool=None,
+                       ejecutor_limite=None):
+    """
+    Ejecuta el pipeline de cada molécula y mide su tiempo, en el pool de
+    procesos o, si hay límite de tiempo por unidad, en procesos aislados
+
+    Args:
+        tarea_molecula: procesar_molecula parcialmente aplicada
+        tareas: Iterable de tuplas (indice_molecula, molecula)
+        numero_trabajadores: Número de procesos (1 para ejecución en serie)
+        pool: Pool de procesos ya creado que se reutiliza entre llamadas
+        ejecutor_limite: EjecutorConLimite (None para ejecutar sin límite)
+
+    Yields:
+        Tuplas (indice_molecula, valores, estadisticas, segundos, fallos), en
+        orden de finalización
+    """
+    if ejecutor_limite is not None:
+        yield from ejecutor_limite.ejecutar(tareas)
+        return
+
+    tarea_cronometrada = functools.partial(cronometrar, tarea_molecula)
+    for resultado in ejecutar_tareas(tarea_cronometrada, tareas, numero_trabajadores, pool=pool):
+        yield (*resultado, [])
+
+# ----------------------------------------------------------------------------
+# PROCESAMIENTO POR BLOQUES
+# ----------------------------------------------------------------------------
+
+def procesar_por_bloques(configuracion, numero_trabajadores, salida_previa=None,
+                         coeficientes_costo=COEFICIENTES_COSTO):
+    """
+    Ejecuta el pipeline completo bloque a bloque: lectura → embebido →
+    descriptores → estadísticas → escritura. Cada bloque terminado se añade al
+    archivo de salida, de modo que la memoria depende del tamaño de bloque
+
+    Args:
+        configuracion: Namespace con la configuración de la ejecución
+        numero_trabajadores: Número de procesos de trabajo
+        salida_previa: SalidaPrevia cuyas filas se reutilizan (modo incremental)
+        coeficientes_costo: Coeficientes del modelo de coste para ordenar las tareas
+
+    Returns:
+        Número de moléculas escritas
+    """
+    escritor = EscritorPorBloques(configuracion.salida, parametros_resultados(configuracion))
+    escritor_tiempos = (EscritorPorBloques(configuracion.tiempos)
+                        if configuracion.tiempos is not None else None)
+
+    calculador_3d = crear_calculador_3d()
+    nombres_descriptores_3d = [str(descriptor) for descriptor in calculador_3d.descriptors]
+    calculador_2d = Calculator(descriptors, ignore_3D=True)
+
+    # Sólo se necesitan las estadísticas: los valores por iteración no salen del proceso
+    tarea_molecula = functools.partial(procesar_molecula,
+                                       numero_iteraciones=configuracion.iteraciones,
+                                       estadisticas_streaming=configuracion.estadisticas_streaming,
+                                       devolver_valores=False,
+                                       ruta_checkpoint=configuracion.checkpoint,
+                                       ruta_cache=configuracion.cache,
+                                       semilla_maestra=configuracion.semilla,
+                                       max_iteraciones_embebido=configuracion.max_iteraciones_embebido,
+                                       puntos_superficie=configuracion.puntos_superficie)
+
+    # Con límite de tiempo por unidad se usan procesos aislados que pueden
+    # terminarse; si no, el pool de procesos se mantiene abierto durante todos
+    # los bloques
+    ejecutor_limite = pool = None
+    if configuracion.tiempo_maximo_unidad is not None:
+        ejecutor_limite = EjecutorConLimite(
+            tarea_molecula, numero_trabajadores, configuracion.tiempo_maximo_unidad,
+            forma_valores=None,
+            forma_estadisticas=(len(METODOS_CONFORMACION), len(ESTADISTICAS_DISTRIBUCION),
+                                len(nombres_descriptores_3d)))
+    elif numero_trabajadores > 1:
+        pool = multiprocessing.Pool(numero_trabajadores)
+    try:
+        for numero_bloque, (bloque_original, moleculas_bloque) in enumerate(
+                leer_moleculas(configuracion.entrada, configuracion.columna_smiles,
+                               configuracion.tamano_bloque, configuracion.shard,
+                               texto=True), start=1):
+            # En modo incremental sólo se calculan las moléculas sin fila previa
+            filas_previas = (salida_previa.buscar(moleculas_bloque) if salida_previa is not None
+                             else [None] * len(moleculas_bloque))
+            filas_calcular = [fila for fila, previa in enumerate(filas_previas) if previa is None]
+            moleculas_calcular = [moleculas_bloque[fila] for fila in filas_calcular]
+            posiciones = {bloque_original.index[fila]: posicion
+                          for posicion, fila in enumerate(filas_calcular)}
+
+            estadisticas_bloque = EstadisticasDescriptores(len(filas_calcular),
+                                                           nombres_descriptores_3d,
+                                                           dtype=configuracion.precision)
+
+            # Las moléculas de mayor coste estimado se reparten primero
+            caracteristicas_bloque, costos_bloque = estimar_costos(moleculas_calcular,
+                                                                   coeficientes_costo)
+            segundos_bloque = np.full(len(moleculas_calcular), np.nan)
+            fallos_bloque = [[] for _ in moleculas_calcular]
+            tareas = ((bloque_original.index[filas_calcular[posicion]], moleculas_calcular[posicion])
+                      for posicion in ordenar_por_costo(costos_bloque))
+            resultados_moleculas = ejecutar_moleculas(tarea_molecula, tareas, numero_trabajadores,
+                                                      pool=pool, ejecutor_limite=ejecutor_limite)
+            for indice_molecula, _, estadisticas_molecula, segundos, fallos in resultados_moleculas:
+                estadisticas_bloque[posiciones[indice_molecula]] = estadisticas_molecula
+                segundos_bloque[posiciones[indice_molecula]] = segundos
+                fallos_bloque[posiciones[indice_molecula]] = fallos
+
+            matriz_descriptores_2d = calcular_descriptores_2d(calculador_2d, moleculas_calcular,
+                                                              numero_trabajadores,
+                                                              ruta_cache=configuracion.cache)
+
+            # Misma composición de columnas que la salida completa
+            matriz_numerica = pd.concat([matriz_descriptores_2d, estadisticas_bloque.matriz()],
+                                        axis=1).replace([np.inf, -np.inf], np.nan)
+            if salida_previa is not None:
+                matriz_numerica = fusionar_con_salida_previa(matriz_numerica, filas_previas,
+                                                             salida_previa)
+            bloque_final = pd.concat([bloque_original.reset_index(drop=True), matriz_numerica],
+                                     axis=1)
+            if ejecutor_limite is not None:
+                bloque_final.insert(len(bloque_original.columns), COLUMNA_FALLOS,
+                                    columna_fallos(fallos_bloque, filas_previas))
+            bloque_final.columns = bloque_final.columns.astype(str)
+
+            escritor.escribir(bloque_final)
+            if escritor_tiempos is not None:
+                escritor_tiempos.escribir(tabla_tiempos(moleculas_calcular, caracteristicas_bloque,
+                                                        costos_bloque, segundos_bloque))
+            print(f"Bloque {numero_bloque} escrito: {len(bloque_final)} moléculas "
+                  f"({escritor.filas_escritas} en total)")
+
+        # Una entrada (o un shard) sin moléculas produce una salida vacía con
+        # las columnas de descriptores, como el pipeline en memoria
+        if escritor.columnas is None:
+            escritor.escribir(pd.concat([
+                calcular_descriptores_2d(calculador_2d, [], numero_trabajadores),
+                EstadisticasDescriptores(0, nombres_descriptores_3d).matriz()], axis=1))
+    finally:
+        escritor.cerrar()
+        if escritor_tiempos is not None:
+            escritor_tiempos.cerrar()
+        if ejecutor_limite is not None:
+            ejecutor_limite.cerrar()
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    return escritor.filas_escritas
+
+# ----------------------------------------------------------------------------
+# DIVISIÓN EN SHARDS Y FUSIÓN DE RESULTADOS PARCIALES
+# ----------------------------------------------------------------------------
+
+def analizar_shard(texto):
+    """
+    Interpreta la especificación de shard "i/N" (0 <= i < N)
+
+    Returns:
+        Tupla (indice_shard, numero_shards)
+    """
+    try:
+        indice_shard, numero_shards = (int(parte) for parte in texto.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Shard no válido: {texto} (formato i/N)")
+    if numero_shards < 1 or not 0 <= indice_shard < numero_shards:
+        raise argparse.ArgumentTypeError(f"Shard no válido: {texto} (se requiere 0 <= i < N)")
+    return indice_shard, numero_shards
+
+def leer_salida_por_bloques(ruta, tamano_bloque, texto=()):
+    """
+    Lee un archivo de resultados completo por bloques (véase recorrer_salida)
+    """
+    for _, bloque in recorrer_salida(ruta, tamano_bloque, texto=texto):
+        yield bloque
+
+def columnas_descriptores_salida():
+    """
+    Nombres de las columnas numéricas de la salida: descriptores 2D y
+    estadísticas de los descriptores 3D
+    """
+    nombres_2d = [str(descriptor) for descriptor in Calculator(descriptors, ignore_3D=True).descriptors]
+    nombres_3d = [str(descriptor) for descriptor in crear_calculador_3d().descriptors]
+    return nombres_2d + EstadisticasDescriptores(0, nombres_3d).nombres_columnas()
+
+def fusionar_shards(rutas_shards, ruta_salida, tamano_bloque=TAMANO_BLOQUE_ENTRADA):
+    """
+    Fusiona las salidas parciales de los shards en la matriz final con el
+    orden de filas de la entrada. Cada shard está ordenado por la columna
+    fila_entrada, así que la fusión avanza por bloques sin cargar los
+    archivos completos.
+
+    Args:
+        rutas_shards: Archivos de salida de cada shard
+        ruta_salida: Archivo de resultados final
+        tamano_bloque: Filas leídas de cada shard por paso
+
+    Returns:
+        Número de filas escritas
+
+    Raises:
+        ValueError: Si faltan filas o hay filas repetidas entre los shards, o
+            si los shards se generaron con parámetros distintos
+    """
+    # Todos los shards deben venir de la misma configuración, que se registra
+    # también en la salida fusionada
+    parametros = parametros_salida(rutas_shards[0])
+    for ruta in rutas_shards[1:]:
+        if parametros_salida(ruta) != parametros:
+            raise ValueError(f"El shard {ruta} se generó con parámetros distintos de los "
+                             f"de {rutas_shards[0]}")
+
+    # Las columnas de la entrada pueden tener un tipo distinto en cada shard:
+    # todas las que no son descriptores se leen como texto
+    numericas = set(columnas_descriptores_salida()) | {COLUMNA_FILA_ENTRADA}
+    texto = {columna for ruta in rutas_shards for columna in columnas_salida(ruta)} - numericas
+    lectores = [leer_salida_por_bloques(ruta, tamano_bloque, texto) for ruta in rutas_shards]
+    pendientes = [pd.DataFrame() for _ in rutas_shards]
+    activos = [True] * len(rutas_shards)
+    escritor = EscritorPorBloques(ruta_salida, parametros)
+    siguiente_fila = 0
+
+    try:
+        while any(activos) or any(len(pendiente) for pendiente in pendientes):
+            # Leer un bloque más de cada shard que no haya terminado
+            for indice, lector in enumerate(lectores):
+                if activos[indice]:
+                    bloque = next(lector, None)
+                    if bloque is None:
+                        activos[indice] = False
+                    else:
+                        pendientes[indice] = pd.concat([pendientes[indice], bloque])
+
+            # Sólo es seguro escribir hasta la última fila leída de los shards activos
+            limite = min((pendiente[COLUMNA_FILA_ENTRADA].iloc[-1] if len(pendiente) else -1)
+                         for pendiente, activo in zip(pendientes, activos) if activo) \
+                if any(activos) else np.inf
+
+            # Los shards vacíos no aportan filas (ni siquiera la columna fila_entrada)
+            listas = [pendiente[pendiente[COLUMNA_FILA_ENTRADA] <= limite]
+                      for pendiente in pendientes if len(pendiente)]
+            pendientes = [pendiente[pendiente[COLUMNA_FILA_ENTRADA] > limite]
+                          if len(pendiente) else pendiente for pendiente in pendientes]
+            if not listas:
+                continue
+            bloque_final = pd.concat(listas).sort_values(COLUMNA_FILA_ENTRADA)
+            if bloque_final.empty:
+                continue
+
+            filas = bloque_final[COLUMNA_FILA_ENTRADA].to_numpy()
+            esperadas = np.arange(siguiente_fila, siguiente_fila + len(filas))
+            if not np.array_equal(filas, esperadas):
+                faltante = esperadas[np.argmax(filas != esperadas)]
+                raise ValueError(f"Fila {faltante} ausente o repetida en los shards; "
+                                 f"compruebe que están todos los archivos parciales")
+            siguiente_fila += len(filas)
+
+            escritor.escribir(bloque_final.drop(columns=COLUMNA_FILA_ENTRADA))
+    finally:
+        escritor.cerrar()
+
+    return escritor.filas_escritas
+
+def main_fusion(argumentos):
+    parser = argparse.ArgumentParser(
+        prog="molecular_descriptor_generator.py merge",
+        description="Fusiona las salidas parciales de --shard en la matriz final")
+    parser.add_argument("shards", nargs="+", help="Archivos de salida de cada shard")
+    parser.add_argument("--salida", default="analisis_descriptores_moleculares_completo.parquet",
+                        help="Archivo de resultados fusionado (.parquet, .feather o .csv)")
+    parser.add_argument("--tamano-bloque", type=int, default=TAMANO_BLOQUE_ENTRADA,
+                        help="Filas leídas de cada shard por paso "
+                             f"(por defecto: {TAMANO_BLOQUE_ENTRADA})")
+    configuracion = parser.parse_args(argumentos)
+
+    print(f"Fusionando {len(configuracion.shards)} shards en {configuracion.salida}...")
+    filas_escritas = fusionar_shards(configuracion.shards, configuracion.salida,
+                                     configuracion.tamano_bloque)
+    print(f"Archivo exportado: {configuracion.salida} ({filas_escritas} moléculas)")
+
+# ----------------------------------------------------------------------------
+# PROGRAMA PRINCIPAL
+# ----------------------------------------------------------------------------
+
+def analizar_argumentos(argumentos=None):
+    """
+    Define y procesa los argumentos de línea de comandos
+
+    Args:
+        argumentos: Lista de argumentos (por defecto, sys.argv)
+
+    Returns:
+        Namespace con la configuración de la ejecución
+    """
+    parser = argparse.ArgumentParser(
+        description="Análisis de descriptores moleculares 3D con múltiples métodos de conformación")
+    parser.add_argument("--entrada", default="DATA.xlsx",
+                        help="Archivo de moléculas; el formato se deduce de la extensión: "
+                             ".xlsx, .csv/.tsv, .smi, .sdf o .parquet (por defecto: DATA.xlsx)")
+    parser.add_argument("--columna-smiles", default="SMILES",
+                        help="Columna con los SMILES en entradas tabulares (por defecto: SMILES)")
+    parser.add_argument("--tamano-bloque", type=int, default=TAMANO_BLOQUE_ENTRADA,
+                        help="Moléculas leídas por bloque del archivo de entrada "
+                             f"(por defecto: {TAMANO_BLOQUE_ENTRADA})")
+    parser.add_argument("--shard", type=analizar_shard, default=None, metavar="i/N",
+                        help="Procesa sólo las filas con índice %% N == i y escribe una salida "
+                             "parcial; las salidas se unen con el comando merge")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Número de procesos para el cálculo por molécula "
+                             "(1 = ejecución en serie; por defecto: todos los núcleos)")
+    parser.add_argument("--precision", choices=["float64", "float32"], default="float64",
+                        help="Tipo numérico del tensor de resultados 3D (por defecto: float64)")
+    parser.add_argument("--iteraciones", type=int, default=50,
+                        help="Número de conformaciones por método y molécula (por defecto: 50)")
+    parser.add_argument("--semilla", type=int, default=SEMILLA_MAESTRA,
+                        help="Semilla maestra de la que se deriva la semilla de embebido de "
+                             "cada molécula y método; -1 para embebidos aleatorios "
+                             f"(por defecto: {SEMILLA_MAESTRA})")
+    parser.add_argument("--salida", default="analisis_descriptores_moleculares_completo.parquet",
+                        help="Archivo de resultados; el formato se elige por la extensión: "
+                             ".parquet, .feather/.arrow, .csv[.gz|.bz2|.xz|.zst] o .xlsx "
+                             "(formato heredado)")
+    parser.add_argument("--por-bloques", action="store_true",
+                        help="Procesa y escribe la salida bloque a bloque (--tamano-bloque); "
+                             "la memoria depende del tamaño de bloque y no del dataset")
+    parser.add_argument("--checkpoint", default=None,
+                        help="Archivo SQLite donde se guarda cada unidad (molécula, método) "
+                             "completada; se elimina al terminar la ejecución "
+                             "(por defecto: <salida>.checkpoint.sqlite)")
+    parser.add_argument("--resume", action="store_true",
+                        help="Reanuda la ejecución omitiendo las unidades ya guardadas en el "
+                             "checkpoint, que debe existir")
+    parser.add_argument("--sobrescribir-checkpoint", action="store_true",
+                        help="Descarta el checkpoint de una ejecución anterior no terminada "
+                             "en lugar de detenerse")
+    parser.add_argument("--sin-checkpoint", action="store_true",
+                        help="No guarda checkpoint de las unidades completadas")
+    parser.add_argument("--cache", default=None,
+                        help="Archivo SQLite de caché de descriptores 2D y 3D compartido entre "
+                             "ejecuciones; las moléculas ya calculadas no se recalculan")
+    parser.add_argument("--incremental", default=None, metavar="SALIDA_PREVIA",
+                        help="Reutiliza las filas de una salida anterior cuyo SMILES canónico "
+                             "coincide y sólo calcula las moléculas nuevas o modificadas")
+    parser.add_argument("--tiempo-maximo-unidad", type=float, default=None, metavar="SEGUNDOS",
+                        help="Tiempo máximo de reloj por unidad (molécula, método); las unidades "
+                             "que lo superan se terminan y quedan como NaN con el motivo en la "
+                             f"columna {COLUMNA_FALLOS}")
+    parser.add_argument("--puntos-superficie", type=int, default=None, metavar="N",
+                        help="Puntos por átomo del cálculo de áreas de los descriptores CPSA "
+                             "(espiral de Fibonacci); menos puntos es más rápido y menos "
+                             "preciso (por defecto: malla de Mordred de 5112 puntos)")
+    parser.add_argument("--max-iteraciones-embebido", type=int, default=0,
+                        help="Límite de iteraciones de cada embebido (por defecto: 0, el valor "
+                             "automático de RDKit)")
+    parser.add_argument("--tiempos", default=None,
+                        help="Archivo (.csv o .parquet) donde se registran el coste estimado y "
+                             "el tiempo real de cada molécula")
+    parser.add_argument("--modelo-costo", default=None, metavar="TIEMPOS",
+                        help="Reajusta el modelo de coste con un archivo de --tiempos previo "
+                             "antes de ordenar las moléculas")
+    parser.add_argument("--estadisticas-streaming", action="store_true",
+                        help="Acumula las estadísticas conformación a conformación (cuartiles "
+                             "aproximados con P²) sin guardar los valores de cada iteración; "
+                             "la memoria no depende del número de iteraciones")
+    return parser.parse_args(argumentos)
+
+def parametros_resultados(configuracion):
+    """
+    Parámetros de la ejecución de los que dependen los valores de la salida;
+    se registran con los resultados y en el checkpoint
+
+    Args:
+        configuracion: Namespace con la configuración de la ejecución
+
+    Returns:
+        Diccionario serializable en JSON
+    """
+    return {"iteraciones": configuracion.iteraciones,
+            "semilla": configuracion.semilla,
+            "max_iteraciones_embebido": configuracion.max_iteraciones_embebido,
+            "estadisticas_streaming": configuracion.estadisticas_streaming,
+            "descriptores_3d": ",".join(NOMBRES_DESCRIPTORES_3D),
+            "descriptores_nativos": VERSION_DESCRIPTORES_NATIVOS,
+            "puntos_superficie": configuracion.puntos_superficie,
+            "precision": configuracion.precision,
+            "rdkit": rdBase.rdkitVersion,
+            "mordred": mordred.__version__}
+
+def main(argumentos=None):
+    argumentos = sys.argv[1:] if argumentos is None else argumentos
+
+    # Subcomando de fusión de las salidas parciales de los shards
+    if argumentos and argumentos[0] == "merge":
+        main_fusion(argumentos[1:])
+        return
+
+    configuracion = analizar_argumentos(argumentos)
+    numero_trabajadores = max(1, configuracion.workers)
+
+    # Validar los formatos de entrada y salida antes de iniciar el cálculo
+    obtener_lector_entrada(configuracion.entrada)
+    escritor_salida = obtener_escritor_salida(configuracion.salida)
+    if configuracion.por_bloques:
+        obtener_escritor_por_bloques(configuracion.salida)
+    if configuracion.tiempos is not None:
+        obtener_escritor_por_bloques(configuracion.tiempos)
+        if os.path.abspath(configuracion.tiempos) == os.path.abspath(configuracion.salida):
+            raise ValueError("El archivo de --tiempos no puede ser el archivo de --salida")
+    if (configuracion.incremental is not None and configuracion.por_bloques
+            and os.path.abspath(configuracion.incremental) == os.path.abspath(configuracion.salida)):
+        raise ValueError("Con --por-bloques la salida previa se lee durante la ejecución y no "
+                         "puede ser el archivo de --salida")
+    if configuracion.iteraciones < 1:
+        raise ValueError("--iteraciones debe ser un entero positivo")
+    if configuracion.puntos_superficie is not None and configuracion.puntos_superficie < 1:
+        raise ValueError("--puntos-superficie debe ser un entero positivo")
+
+    # Las filas reutilizadas se leen antes de escribir la salida en memoria, que
+    # puede ser el mismo archivo, y antes de crear el checkpoint por si sus
+    # parámetros no coinciden
+    salida_previa = None
+    if configuracion.incremental is not None:
+        print(f"Modo incremental: leyendo resultados previos de {configuracion.incremental}")
+        salida_previa = SalidaPrevia(configuracion.incremental, configuracion.columna_smiles,
+                                     configuracion.tamano_bloque,
+                                     parametros_resultados(configuracion))
+
+    # Checkpoint de unidades completadas, guardado por defecto junto a la salida
+    if configuracion.sin_checkpoint:
+        if configuracion.resume or configuracion.checkpoint is not None:
+            raise ValueError("--sin-checkpoint no puede combinarse con --checkpoint ni --resume")
+    elif configuracion.checkpoint is None:
+        configuracion.checkpoint = configuracion.salida + ".checkpoint.sqlite"
+    if configuracion.checkpoint is not None:
+        unidades_completadas = preparar_checkpoint(
+            configuracion.checkpoint,
+            {**parametros_resultados(configuracion),
+             # Con --por-bloques cada unidad guarda sólo sus estadísticas
+             "valores_por_iteracion": not (configuracion.estadisticas_streaming or
+                                           configuracion.por_bloques)},
+            reanudar=configuracion.resume,
+            sobrescribir=configuracion.sobrescribir_checkpoint)
+        print(f"Checkpoint: {configuracion.checkpoint} "
+              f"({unidades_completadas} unidades ya completadas)")
+    if configuracion.cache is not None and configuracion.semilla == SEMILLA_ALEATORIA:
+        print("Con --semilla -1 la caché sólo se usa para los descriptores 2D")
+
+    # Modelo de coste para ordenar las moléculas (reajustado con tiempos previos)
+    coeficientes_costo = COEFICIENTES_COSTO
+    if configuracion.modelo_costo is not None:
+        coeficientes_costo = ajustar_modelo_costo(configuracion.modelo_costo)
+
+    if configuracion.por_bloques:
+        print(f"Procesamiento por bloques de {configuracion.tamano_bloque} moléculas "
+              f"desde {configuracion.entrada}")
+        moleculas_escritas = procesar_por_bloques(configuracion, numero_trabajadores,
+                                                  salida_previa, coeficientes_costo)
+        print(f"Archivo exportado: {configuracion.salida} ({moleculas_escritas} moléculas)")
+        finalizar_checkpoint(configuracion.checkpoint)
+        print("\n=== ANÁLISIS FINALIZADO ===")
+        return
+
+    # ----------------------------------------------------------------------------
+    # CARGA Y PREPARACIÓN DE DATOS MOLECULARES
+    # ----------------------------------------------------------------------------
+
+    # Cargar dataset con estructuras moleculares; el archivo se lee por bloques
+    # y cada bloque conserva sus columnas originales alineadas con las moléculas
+    print(f"Cargando dataset molecular desde {configuracion.entrada}...")
+    bloques_originales = []
+    moleculas_base = []
+    for bloque_original, moleculas_bloque in leer_moleculas(configuracion.entrada,
+                                                            configuracion.columna_smiles,
+                                                            configuracion.tamano_bloque,
+                                                            configuracion.shard):
+        bloques_originales.append(bloque_original)
+        moleculas_base.extend(moleculas_bloque)
+    df_original = pd.concat(bloques_originales) if bloques_originales else pd.DataFrame()
+
+    moleculas_no_validas = sum(molecula is None for molecula in moleculas_base)
+    print(f"Dataset cargado: {len(moleculas_base)} moléculas encontradas"
+          f" ({moleculas_no_validas} no válidas)")
+
+    moleculas_para_conformaciones = moleculas_base
+
+    # Modo incremental: sólo se calculan las moléculas cuyo SMILES canónico no
+    # figura en la salida previa
+    filas_previas = [None] * len(moleculas_base)
+    if salida_previa is not None:
+        filas_previas = salida_previa.buscar(moleculas_base)
+        moleculas_para_conformaciones = [molecula for molecula, previa
+                                         in zip(moleculas_base, filas_previas) if previa is None]
+        print(f"Moléculas reutilizadas de la salida previa: "
+              f"{len(moleculas_base) - len(moleculas_para_conformaciones)}; "
+              f"por calcular: {len(moleculas_para_conformaciones)}")
+
+    # ----------------------------------------------------------------------------
+    # CONFIGURACIÓN DEL CALCULADOR DE DESCRIPTORES
+    # ----------------------------------------------------------------------------
+
+    # Definir número de iteraciones para análisis estadístico
+    numero_iteraciones = configuracion.iteraciones
+    indices_moleculas = list(range(len(moleculas_para_conformaciones)))
+
+    print(f"\nConfiguración del análisis:")
+    print(f"- Número de iteraciones: {numero_iteraciones}")
+    print(f"- Número de moléculas: {len(indices_moleculas)}")
+
+    print(f"- Procesos de trabajo: {numero_trabajadores}")
+    print(f"- Descriptores 3D seleccionados: {len(NOMBRES_DESCRIPTORES_3D)}")
+
+    # Crear calculador final con descriptores filtrados
+    calculador_3d = crear_calculador_3d()
+    descriptores_filtrados = calculador_3d.descriptors
+
+    print(f"- Descriptores disponibles para cálculo: {len(descriptores_filtrados)}")
+
+    # ----------------------------------------------------------------------------
+    # CÁLCULO DE DESCRIPTORES Y ESTADÍSTICAS POR MOLÉCULA
+    # ----------------------------------------------------------------------------
+
+    print("\n=== INICIANDO CÁLCULO DE DESCRIPTORES ===")
+
+    nombres_descriptores_3d = [str(descriptor) for descriptor in descriptores_filtrados]
+    estadisticas_distribucion = EstadisticasDescriptores(len(indices_moleculas),
+                                                         nombres_descriptores_3d,
+                                                         dtype=configuracion.precision)
+
+    # Tensor preasignado [molécula, método, iteración, descriptor]; en modo
+    # streaming sólo se conservan las estadísticas acumuladas
+    resultados_descriptores = None
+    if not configuracion.estadisticas_streaming:
+        resultados_descriptores = ResultadosDescriptores(len(indices_moleculas), numero_iteraciones,
+                                                         nombres_descriptores_3d,
+                                                         dtype=configuracion.precision)
+        print(f"Memoria reservada para resultados 3D: "
+              f"{resultados_descriptores.tensor.nbytes / 1024 ** 2:.1f} MB")
+    else:
+        print(f"Estadísticas en modo streaming: "
+              f"{estadisticas_distribucion.tensor.nbytes / 1024 ** 2:.1f} MB reservados")
+
+    # Cada molécula recorre embebido → optimización → descriptores → estadísticas
+    # en un proceso de trabajo; los resultados llegan según van terminando
+    tarea_molecula = functools.partial(procesar_molecula, numero_iteraciones=numero_iteraciones,
+                                       estadisticas_streaming=configuracion.estadisticas_streaming,
+                                       ruta_checkpoint=configuracion.checkpoint,
+                                       ruta_cache=configuracion.cache,
+                                       semilla_maestra=configuracion.semilla,
+                                       max_iteraciones_embebido=configuracion.max_iteraciones_embebido,
+                                       puntos_superficie=configuracion.puntos_superficie)
+
+    # Con límite de tiempo por unidad, cada unidad (molécula, método) se ejecuta
+    # en un proceso aislado que se termina si supera el límite
+    ejecutor_limite = None
+    if configuracion.tiempo_maximo_unidad is not None:
+        forma_valores = (None if configuracion.estadisticas_streaming else
+                         (len(METODOS_CONFORMACION), numero_iteraciones,
+                          len(nombres_descriptores_3d)))
+        ejecutor_limite = EjecutorConLimite(
+            tarea_molecula, numero_trabajadores, configuracion.tiempo_maximo_unidad,
+            forma_valores=forma_valores,
+            forma_estadisticas=(len(METODOS_CONFORMACION), len(ESTADISTICAS_DISTRIBUCION),
+                                len(nombres_descriptores_3d)))
+
+    # Las moléculas de mayor coste estimado (átomos pesados, anillos, enlaces
+    # rotables) se reparten primero para no esperar al final por las más grandes
+    caracteristicas_moleculas, costos_estimados = estimar_costos(moleculas_para_conformaciones,
+                                                                 coeficientes_costo)
+    segundos_moleculas = np.full(len(indices_moleculas), np.nan)
+    fallos_moleculas = [[] for _ in indices_moleculas]
+    tareas = ((indice_molecula, moleculas_para_conformaciones[indice_molecula])
+              for indice_molecula in ordenar_por_costo(costos_estimados))
+    moleculas_completadas = 0
+
+    try:
+        for indice_molecula, valores_molecula, estadisticas_molecula, segundos, fallos in \
+                ejecutar_moleculas(tarea_molecula, tareas, numero_trabajadores,
+                                   ejecutor_limite=ejecutor_limite):
+            segundos_moleculas[indice_molecula] = segundos
+            fallos_moleculas[indice_molecula] = fallos
+            if resultados_descriptores is not None:
+                resultados_descriptores[indice_molecula] = valores_molecula
+            estadisticas_distribucion[indice_molecula] = estadisticas_molecula
+            moleculas_completadas += 1
+            print(f"Molécula procesada {moleculas_completadas}/{len(indices_moleculas)} "
+                  f"(índice {indice_molecula + 1})"
+                  + (f" - fallos: {'; '.join(fallos)}" if fallos else ""))
+    finally:
+        if ejecutor_limite is not None:
+            ejecutor_limite.cerrar()
+
+    print("Cálculo de descriptores y análisis estadístico completado.")
+
+    # Mostrar ejemplo de resultados
+    if resultados_descriptores is not None and numero_iteraciones > 1 and indices_moleculas:
+        print(f"\nEjemplo de resultados (iteración 1): {resultados_descriptores[1].shape}")
+
+    # Ejemplo de estadísticas para la molécula 2
+    if len(indices_moleculas) > 2:
+        print(f"\nEjemplo de estadísticas (molécula 2): {estadisticas_distribucion[2].shape}")
+
+    # ----------------------------------------------------------------------------
+    # PREPARACIÓN DE MATRIZ FINAL DE CARACTERÍSTICAS
+    # ----------------------------------------------------------------------------
+
+    print("\n=== PREPARANDO MATRIZ FINAL DE CARACTERÍSTICAS ===")
+
+    # Las estadísticas ya se calcularon una sola vez por molécula; los nombres se
+    # derivan de los ejes de descriptores y estadísticas
+    nombres_columnas_finales = estadisticas_distribucion.nombres_columnas()
+
+    print(f"Nombres de columnas generados: {len(nombres_columnas_finales)}")
+
+    # Matriz final de características estadísticas 3D (una fila por molécula)
+    matriz_descriptores_estadisticos = estadisticas_distribucion.matriz()
+
+    print(f"Matriz de descriptores estadísticos 3D: {matriz_descriptores_estadisticos.shape}")
+
+    # ----------------------------------------------------------------------------
+    # CÁLCULO DE DESCRIPTORES 2D COMPLEMENTARIOS
+    # ----------------------------------------------------------------------------
+
+    print("\n=== CALCULANDO DESCRIPTORES 2D COMPLEMENTARIOS ===")
+
+    # Usar moléculas originales sin conformación 3D
+    moleculas_2d = moleculas_para_conformaciones
+
+    # Crear calculador para descriptores 2D
+    calculador_2d = Calculator(descriptors, ignore_3D=True)
+
+    # Calcular descriptores 2D (valores faltantes como NaN)
+    matriz_descriptores_2d = calcular_descriptores_2d(calculador_2d, moleculas_2d,
+                                                      numero_trabajadores,
+                                                      ruta_cache=configuracion.cache)
+
+    print(f"Descriptores 2D calculados: {matriz_descriptores_2d.shape}")
+
+    # ----------------------------------------------------------------------------
+    # COMBINACIÓN Y LIMPIEZA DE DATOS FINALES
+    # ----------------------------------------------------------------------------
+
+    print("\n=== COMBINANDO Y LIMPIANDO DATOS FINALES ===")
+
+    # Combinar descriptores 2D y estadísticas 3D
+    matriz_completa_descriptores = pd.concat([matriz_descriptores_2d, matriz_descriptores_estadisticos], axis=1)
+
+    print(f"Matriz completa de descriptores: {matriz_completa_descriptores.shape}")
+
+    # Ambas matrices son numéricas y usan NaN para los valores faltantes; sólo
+    # queda descartar los valores infinitos manteniendo las columnas en float
+    matriz_numerica = matriz_completa_descriptores.replace([np.inf, -np.inf], np.nan)
+
+    print(f"Matriz después de limpieza: {matriz_numerica.shape}")
+
+    # Reincorporar las filas reutilizadas en el orden de la entrada
+    if salida_previa is not None:
+        matriz_numerica = fusionar_con_salida_previa(matriz_numerica, filas_previas,
+                                                     salida_previa)
+        print(f"Matriz tras fusionar con la salida previa: {matriz_numerica.shape}")
+
+    # ----------------------------------------------------------------------------
+    # COMBINACIÓN CON DATOS ORIGINALES Y EXPORTACIÓN
+    # ----------------------------------------------------------------------------
+
+    print("\n=== EXPORTANDO RESULTADOS FINALES ===")
+
+    # Combinar con el dataset original
+    dataset_final = pd.concat([df_original.reset_index(drop=True), matriz_numerica], axis=1)
+
+    # Motivos de fallo de las unidades que superaron el límite de tiempo
+    if ejecutor_limite is not None:
+        dataset_final.insert(len(df_original.columns), COLUMNA_FALLOS,
+                             columna_fallos(fallos_moleculas, filas_previas))
+
+    # Exportar con el escritor correspondiente a la extensión del archivo
+    nombre_archivo_salida = configuracion.salida
+    dataset_final.columns = dataset_final.columns.astype(str)
+    escritor_salida(dataset_final, nombre_archivo_salida, parametros_resultados(configuracion))
+
+    # Registrar los tiempos reales por molécula para reajustar el modelo de
+    # coste, una vez asegurada la salida principal
+    if configuracion.tiempos is not None:
+        escritor_tiempos = EscritorPorBloques(configuracion.tiempos)
+        escritor_tiempos.escribir(tabla_tiempos(moleculas_para_conformaciones,
+                                                caracteristicas_moleculas, costos_estimados,
+                                                segundos_moleculas))
+        escritor_tiempos.cerrar()
+        print(f"Tiempos por molécula registrados en {configuracion.tiempos}")
 
-# Combinar con el dataset original
-dataset_final = pd.concat([df_original, matriz_numerica], axis=1)
+    # La salida ya está escrita: el checkpoint no volverá a necesitarse
+    finalizar_checkpoint(configuracion.checkpoint)
 
-# Exportar a archivo Excel
-nombre_archivo_salida = 'analisis_descriptores_moleculares_completo.xlsx'
-dataset_final.to_excel(nombre_archivo_salida, index=False)
+    print(f"Análisis completado exitosamente!")
+    print(f"Archivo exportado: {nombre_archivo_salida}")
+    print(f"Dataset final: {dataset_final.shape}")
+    print(f"- Moléculas procesadas: {len(indices_moleculas)}")
+    print(f"- Métodos de conformación utilizados: 6 (ETKDGv1, ETKDGv2, ETDG, KDG, UFF, MMFF)")
+    print(f"- Iteraciones por método: {numero_iteraciones}")
+    print(f"- Descriptores 3D base: {len(descriptores_filtrados)}")
+    print(f"- Total de características finales: {dataset_final.shape[1]}")
 
-print(f"Análisis completado exitosamente!")
-print(f"Archivo exportado: {nombre_archivo_salida}")
-print(f"Dataset final: {dataset_final.shape}")
-print(f"- Moléculas procesadas: {len(indices_moleculas)}")
-print(f"- Métodos de conformación utilizados: 6 (ETKDGv1, ETKDGv2, ETDG, KDG, UFF, MMFF)")
-print(f"- Iteraciones por método: {numero_iteraciones}")
-print(f"- Descriptores 3D base: {len(descriptores_filtrados)}")
-print(f"- Total de características finales: {dataset_final.shape[1]}")
+    print("\n=== ANÁLISIS FINALIZADO ===")
 
-print("\n=== ANÁLISIS FINALIZADO ===")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
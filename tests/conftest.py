@@ -0,0 +1,25 @@
+import os
+import sys
+
+import pytest
+
+# El script principal se importa como módulo desde la raíz del repositorio
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utilidades import MOLECULAS, ejecutar  # noqa: E402
+
+@pytest.fixture(scope="session")
+def directorio(tmp_path_factory):
+    return tmp_path_factory.mktemp("cli")
+
+@pytest.fixture(scope="session")
+def entrada(directorio):
+    ruta = directorio / "entrada.smi"
+    ruta.write_text(MOLECULAS)
+    return ruta
+
+@pytest.fixture(scope="session")
+def salida_completa(directorio, entrada):
+    ruta = directorio / "completa.csv"
+    ejecutar("--entrada", entrada, "--salida", ruta)
+    return ruta
@@ -0,0 +1,28 @@
+# ============================================================================
+# CACHÉ DE DESCRIPTORES ENTRE EJECUCIONES
+# ============================================================================
+
+import sqlite3
+
+import pandas as pd
+
+from utilidades import ejecutar, leer
+
+def entradas_cache(ruta):
+    with sqlite3.connect(ruta) as conexion:
+        return conexion.execute("SELECT COUNT(*) FROM descriptores").fetchone()[0]
+
+def test_ejecucion_con_cache_coincide_con_la_completa(directorio, entrada, salida_completa):
+    cache = directorio / "cache.sqlite"
+    for repeticion in range(2):
+        ruta = directorio / f"con_cache_{repeticion}.csv"
+        ejecutar("--entrada", entrada, "--salida", ruta, "--cache", cache)
+        pd.testing.assert_frame_equal(leer(ruta), leer(salida_completa), check_exact=True)
+
+def test_semilla_aleatoria_no_usa_la_cache_3d(directorio, entrada):
+    cache = directorio / "cache_aleatoria.sqlite"
+    ejecutar("--entrada", entrada, "--salida", directorio / "aleatoria.csv", "--cache", cache,
+             "--semilla", "-1")
+
+    # Sólo las dos moléculas válidas, con sus descriptores 2D
+    assert entradas_cache(cache) == 2
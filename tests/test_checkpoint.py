@@ -0,0 +1,60 @@
+# ============================================================================
+# CHECKPOINT Y REANUDACIÓN
+# ============================================================================
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from rdkit import Chem
+
+import molecular_descriptor_generator as generador
+from utilidades import ejecutar, leer
+
+def test_ejecucion_completa_elimina_el_checkpoint(salida_completa):
+    resultados = leer(salida_completa)
+    assert len(resultados) == 3
+    assert resultados.filter(like="GeomDiameter").iloc[:2].notna().all().all()
+    assert resultados.filter(like="GeomDiameter").iloc[2].isna().all()
+    assert not os.path.exists(f"{salida_completa}.checkpoint.sqlite")
+
+def test_reanudar_checkpoint(directorio, entrada, salida_completa):
+    ruta = directorio / "reanudada.csv"
+    checkpoint = f"{ruta}.checkpoint.sqlite"
+
+    # Checkpoint de una ejecución interrumpida sin unidades completadas
+    generador.preparar_checkpoint(checkpoint, {}, reanudar=False)
+    with pytest.raises(FileExistsError):
+        ejecutar("--entrada", entrada, "--salida", ruta)
+
+    ejecutar("--entrada", entrada, "--salida", ruta, "--resume")
+    pd.testing.assert_frame_equal(leer(ruta), leer(salida_completa), check_exact=True)
+    assert not os.path.exists(checkpoint)
+
+def test_checkpoint_sin_valores_guarda_solo_estadisticas(directorio):
+    checkpoint = str(directorio / "estadisticas.checkpoint.sqlite")
+    molecula = Chem.MolFromSmiles("CCO")
+    generador.preparar_checkpoint(checkpoint, {}, reanudar=False)
+    try:
+        _, valores, estadisticas = generador.procesar_molecula(
+            (0, molecula), numero_iteraciones=4, devolver_valores=False,
+            ruta_checkpoint=checkpoint, semilla_maestra=42)
+        guardado = generador.obtener_almacen_checkpoint(checkpoint).leer(
+            0, generador.METODOS_CONFORMACION[0][0], Chem.MolToSmiles(molecula))
+    finally:
+        generador.finalizar_checkpoint(checkpoint)
+
+    assert valores is None
+    assert guardado.shape == (len(generador.ESTADISTICAS_DISTRIBUCION), estadisticas.shape[-1])
+    np.testing.assert_array_equal(guardado, estadisticas[0])
+
+    # Mismas estadísticas que a partir de los valores por iteración
+    _, _, referencia = generador.procesar_molecula((0, molecula), numero_iteraciones=4,
+                                                   semilla_maestra=42)
+    np.testing.assert_array_equal(estadisticas, referencia)
+
+def test_resume_sin_checkpoint_falla_antes_de_calcular(directorio, entrada, monkeypatch):
+    monkeypatch.chdir(directorio)
+    with pytest.raises(FileNotFoundError):
+        ejecutar("--entrada", entrada, "--resume", "--salida", "sin_checkpoint.csv")
@@ -0,0 +1,76 @@
+# ============================================================================
+# PARIDAD DE LOS DESCRIPTORES 3D NATIVOS CON MORDRED
+# ============================================================================
+
+import numpy as np
+import pytest
+from rdkit import Chem
+
+import molecular_descriptor_generator as generador
+
+# Moléculas con heteroátomos, cargas, halógenos, anillos y una sal con átomos
+# sin enlazar
+SMILES_PARIDAD = [
+    "CCO",
+    "c1ccccc1O",
+    "CC(=O)Nc1ccc(O)cc1",
+    "CCCCCCCCN1C(=O)/C(=C/C(=O)OC)S/C1=N/N=C/c1cccc([N+](=O)[O-])c1",
+    "COC(=O)/C=C1\\S/C(=N/N=C(/C)c2cc(Cl)ccc2O)NC1=O",
+    "C[NH3+].[Cl-]",
+]
+
+NUMERO_CONFORMACIONES = 3
+
+@pytest.fixture(scope="module")
+def motor():
+    return generador.MotorDescriptores3D(generador.crear_calculador_3d())
+
+def conformaciones(smiles):
+    molecula_preparada = generador.MoleculaPreparada(Chem.MolFromSmiles(smiles))
+    molecula = generador.generar_conformaciones_multiples(molecula_preparada, "ETKDGv2",
+                                                          NUMERO_CONFORMACIONES, semilla=7)
+    return molecula_preparada, molecula
+
+def referencia_mordred(calculador, molecula):
+    return np.array([list(calculador(molecula, id=conformacion.GetId()).fill_missing(np.nan))
+                     for conformacion in molecula.GetConformers()], dtype=np.float64)
+
+@pytest.mark.parametrize("smiles", SMILES_PARIDAD)
+def test_bloques_nativos_coinciden_con_mordred(motor, smiles, monkeypatch):
+    # Mordred 1.2 usa el alias np.float, retirado en NumPy 1.24
+    monkeypatch.setattr(np, "float", float, raising=False)
+    molecula_preparada, molecula = conformaciones(smiles)
+    assert molecula.GetNumConformers() == NUMERO_CONFORMACIONES
+
+    nativos = motor.calcular(molecula, propiedades_atomicas=molecula_preparada.propiedades_atomicas)
+    mordred = referencia_mordred(generador.crear_calculador_3d(), molecula)
+    assert np.isfinite(mordred).mean() > 0.5
+
+    np.testing.assert_array_equal(np.isnan(nativos), np.isnan(mordred))
+    np.testing.assert_allclose(nativos, mordred, rtol=1e-9, atol=1e-9, equal_nan=True)
+
+def test_motor_no_delega_familias_nativas_en_mordred(motor):
+    # Todos los descriptores 3D de interés tienen implementación nativa
+    assert motor.calculador_mordred is None
+    assert len(motor.nombres) == len(generador.NOMBRES_DESCRIPTORES_3D)
+
+def test_tramos_de_conformaciones_coinciden_con_una_pasada(motor, monkeypatch):
+    molecula_preparada, molecula = conformaciones(SMILES_PARIDAD[3])
+    una_pasada = motor.calcular(molecula)
+
+    # Tramos de una conformación por pasada
+    monkeypatch.setattr(generador, "ELEMENTOS_MAXIMOS_PASADA", molecula.GetNumAtoms() ** 2)
+    por_tramos = np.array(list(generador.iterar_descriptores_conformaciones(
+        motor, molecula, propiedades_atomicas=molecula_preparada.propiedades_atomicas)))
+
+    np.testing.assert_allclose(por_tramos, una_pasada, rtol=1e-12, atol=1e-12, equal_nan=True)
+
+def test_puntos_superficie_aproximan_la_malla_de_mordred():
+    molecula_preparada, molecula = conformaciones(SMILES_PARIDAD[2])
+    coordenadas = molecula.GetConformer().GetPositions()
+    radios = generador.radios_sasa(molecula_preparada.propiedades_atomicas.numeros_atomicos)
+
+    exacta = generador.calcular_areas_atomicas(coordenadas, radios, generador.malla_esfera())
+    rapida = generador.calcular_areas_atomicas(coordenadas, radios, generador.malla_esfera(960))
+
+    assert abs(rapida.sum() - exacta.sum()) / exacta.sum() < 0.01
@@ -0,0 +1,40 @@
+# ============================================================================
+# ESTADÍSTICAS EN FLUJO Y NÚMERO DE ITERACIONES
+# ============================================================================
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import molecular_descriptor_generator as generador
+from utilidades import ejecutar, leer
+
+def test_acumulador_coincide_con_las_estadisticas_exactas():
+    valores = np.random.default_rng(0).normal(size=(200, 3))
+    valores[::7, 1] = np.nan
+    valores[:, 2] = np.nan
+
+    acumulador = generador.AcumuladorEstadisticas(valores.shape[1])
+    for fila in valores:
+        acumulador.actualizar(fila)
+    exactas = generador.calcular_estadisticas_distribucion(valores, eje=0)
+
+    np.testing.assert_array_equal(np.isnan(acumulador.estadisticas()), np.isnan(exactas))
+    np.testing.assert_allclose(acumulador.estadisticas(), exactas, atol=0.1, equal_nan=True)
+
+def test_pocas_iteraciones_en_flujo_son_exactas(directorio, entrada, salida_completa):
+    # Con cinco iteraciones o menos los cuartiles P² son exactos
+    ruta = directorio / "streaming.csv"
+    ejecutar("--entrada", entrada, "--salida", ruta, "--estadisticas-streaming")
+    pd.testing.assert_frame_equal(leer(ruta), leer(salida_completa), check_exact=True)
+
+def test_una_iteracion(directorio, entrada):
+    ruta = directorio / "una_iteracion.csv"
+    generador.main(["--workers", "1", "--iteraciones", "1", "--entrada", str(entrada),
+                    "--salida", str(ruta)])
+    assert len(leer(ruta)) == 3
+
+def test_iteraciones_no_positivas_fallan_antes_de_calcular(directorio, entrada, monkeypatch):
+    monkeypatch.chdir(directorio)
+    with pytest.raises(ValueError):
+        ejecutar("--entrada", entrada, "--iteraciones", "0")
@@ -0,0 +1,57 @@
+# ============================================================================
+# MODO INCREMENTAL SOBRE UNA SALIDA PREVIA
+# ============================================================================
+
+import os
+
+import pandas as pd
+import pytest
+
+import molecular_descriptor_generator as generador
+from utilidades import ejecutar, leer
+
+@pytest.mark.parametrize("por_bloques", [False, True])
+def test_incremental_sin_moleculas_nuevas(directorio, entrada, salida_completa, por_bloques):
+    ruta = directorio / f"incremental_{por_bloques}.csv"
+    opciones = ["--por-bloques", "--tamano-bloque", "1"] if por_bloques else []
+    ejecutar("--entrada", entrada, "--salida", ruta, "--incremental", salida_completa, *opciones)
+    pd.testing.assert_frame_equal(leer(ruta), leer(salida_completa), check_exact=True)
+
+@pytest.mark.parametrize("por_bloques", [False, True])
+def test_entrada_vacia(directorio, por_bloques):
+    vacia = directorio / "vacia.smi"
+    vacia.write_text("")
+    ruta = directorio / f"vacia_{por_bloques}.csv"
+    ejecutar("--entrada", vacia, "--salida", ruta, *(["--por-bloques"] if por_bloques else []))
+    assert len(leer(ruta)) == 0
+
+@pytest.mark.parametrize("extension", [".csv", ".parquet", ".feather"])
+@pytest.mark.parametrize("por_bloques", [False, True])
+def test_parametros_registrados_en_la_salida(directorio, entrada, extension, por_bloques):
+    ruta = str(directorio / f"parametros_{por_bloques}{extension}")
+    ejecutar("--entrada", entrada, "--salida", ruta, "--semilla", "7",
+             *(["--por-bloques"] if por_bloques else []))
+    parametros = generador.parametros_salida(ruta)
+    assert parametros["iteraciones"] == 2
+    assert parametros["semilla"] == 7
+    assert parametros["descriptores_nativos"] == generador.VERSION_DESCRIPTORES_NATIVOS
+
+@pytest.mark.parametrize("argumentos", [
+    ["--iteraciones", "3"],
+    ["--semilla", "7"],
+    ["--puntos-superficie", "100"],
+    ["--max-iteraciones-embebido", "50"],
+    ["--estadisticas-streaming"],
+])
+def test_incremental_con_otros_parametros_falla(directorio, entrada, salida_completa, argumentos):
+    with pytest.raises(ValueError, match="se generó con"):
+        ejecutar("--entrada", entrada, "--salida", directorio / "otros_parametros.csv",
+                 "--incremental", salida_completa, *argumentos)
+
+def test_incremental_sin_parametros_registrados_falla(directorio, entrada, salida_completa):
+    previa = directorio / "sin_parametros.csv"
+    leer(salida_completa).to_csv(previa, index=False)
+    assert not os.path.exists(generador.ruta_parametros_salida(str(previa)))
+    with pytest.raises(ValueError, match="no registra"):
+        ejecutar("--entrada", entrada, "--salida", directorio / "sin_parametros_nueva.csv",
+                 "--incremental", previa)
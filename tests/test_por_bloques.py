@@ -0,0 +1,59 @@
+# ============================================================================
+# PIPELINE POR BLOQUES Y ESCRITURA INCREMENTAL
+# ============================================================================
+
+import pandas as pd
+import pytest
+
+import molecular_descriptor_generator as generador
+from utilidades import ejecutar, leer
+
+def test_bloques_con_tipos_distintos(directorio):
+    # Primera fila sin nombre, columna vacía en el primer bloque y columna
+    # entera que después tiene texto
+    entrada = directorio / "tipos.csv"
+    pd.DataFrame({"SMILES": ["CCO", "c1ccccc1O", "CCN"],
+                  "Nombre": [None, "fenol", "amina"],
+                  "Lote": [1, "B-2", None]}).to_csv(entrada, index=False)
+
+    ruta = directorio / "tipos.parquet"
+    ejecutar("--entrada", entrada, "--salida", ruta, "--por-bloques", "--tamano-bloque", "1")
+    resultados = pd.read_parquet(ruta)
+
+    assert resultados["Nombre"].tolist() == [pd.NA, "fenol", "amina"]
+    assert resultados["Lote"].tolist() == ["1", "B-2", pd.NA]
+    assert resultados.filter(like="GeomDiameter").notna().all().all()
+
+def test_salida_smi_por_bloques_coincide_con_la_completa(directorio, entrada, salida_completa):
+    ruta = directorio / "por_bloques.parquet"
+    ejecutar("--entrada", entrada, "--salida", ruta, "--por-bloques", "--tamano-bloque", "1")
+    pd.testing.assert_frame_equal(pd.read_parquet(ruta), leer(salida_completa),
+                                  check_exact=True, check_dtype=False)
+
+def test_fusion_de_shards_con_tipos_distintos(directorio):
+    # La columna Lote es numérica en un shard y texto en el otro
+    entrada = directorio / "lotes.csv"
+    pd.DataFrame({"SMILES": ["CCO", "CCN"], "Lote": ["7", "B-2"]}).to_csv(entrada, index=False)
+    rutas = []
+    for shard in ("0/2", "1/2"):
+        ruta = directorio / f"lotes_{shard.replace('/', '_')}.parquet"
+        ejecutar("--entrada", entrada, "--salida", ruta, "--shard", shard, "--tamano-bloque", "1")
+        rutas.append(str(ruta))
+
+    fusion = directorio / "lotes_fusion.parquet"
+    generador.main(["merge", *rutas, "--salida", str(fusion)])
+    assert pd.read_parquet(fusion)["Lote"].tolist() == ["7", "B-2"]
+
+def test_columnas_nuevas_en_un_bloque_posterior_fallan(directorio):
+    escritor = generador.EscritorPorBloques(str(directorio / "nuevas.parquet"))
+    try:
+        escritor.escribir(pd.DataFrame({"a": [1.0]}))
+        with pytest.raises(ValueError):
+            escritor.escribir(pd.DataFrame({"a": [2.0], "b": ["x"]}))
+    finally:
+        escritor.cerrar()
+
+def test_salida_excel_por_bloques_falla_antes_de_calcular(directorio, entrada, monkeypatch):
+    monkeypatch.chdir(directorio)
+    with pytest.raises(ValueError):
+        ejecutar("--entrada", entrada, "--por-bloques", "--salida", "salida.xlsx")
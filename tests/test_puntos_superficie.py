@@ -0,0 +1,26 @@
+# ============================================================================
+# PRECISIÓN AJUSTABLE DEL ÁREA SUPERFICIAL
+# ============================================================================
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import molecular_descriptor_generator as generador
+from utilidades import ejecutar, leer
+
+def test_puntos_superficie_solo_cambian_los_descriptores_cpsa(directorio, entrada, salida_completa):
+    ruta = directorio / "superficie_rapida.csv"
+    ejecutar("--entrada", entrada, "--salida", ruta, "--puntos-superficie", "960")
+    rapida, completa = leer(ruta), leer(salida_completa)
+
+    cpsa = generador.EstadisticasDescriptores(0, generador.NOMBRES_CPSA).nombres_columnas()
+    areas = [columna for columna in cpsa if "TASA" in columna]
+    np.testing.assert_allclose(rapida[areas], completa[areas], rtol=0.02)
+    resto = [columna for columna in completa.columns if columna not in set(cpsa)]
+    pd.testing.assert_frame_equal(rapida[resto], completa[resto], check_exact=True)
+
+def test_puntos_superficie_no_positivos_fallan_antes_de_calcular(directorio, entrada, monkeypatch):
+    monkeypatch.chdir(directorio)
+    with pytest.raises(ValueError):
+        ejecutar("--entrada", entrada, "--puntos-superficie", "0")
@@ -0,0 +1,32 @@
+# ============================================================================
+# EJECUCIONES PARCIALES (SHARDS) Y FUSIÓN
+# ============================================================================
+
+import pandas as pd
+import pytest
+
+import molecular_descriptor_generator as generador
+from utilidades import ejecutar, leer
+
+def test_shards_y_fusion_coinciden_con_una_ejecucion(directorio, entrada, salida_completa):
+    # El shard 2/3 sólo contiene la estructura no válida y 3/4 ninguna fila
+    rutas = []
+    for shard in ("0/3", "1/3", "2/3", "3/4"):
+        ruta = directorio / f"shard_{shard.replace('/', '_')}.csv"
+        ejecutar("--entrada", entrada, "--salida", ruta, "--shard", shard)
+        rutas.append(str(ruta))
+
+    fusion = directorio / "fusion.csv"
+    generador.main(["merge", *rutas, "--salida", str(fusion)])
+    pd.testing.assert_frame_equal(leer(fusion), leer(salida_completa), check_exact=True)
+    assert generador.parametros_salida(str(fusion)) == generador.parametros_salida(rutas[0])
+
+def test_fusion_de_shards_con_otros_parametros_falla(directorio, entrada):
+    rutas = []
+    for shard, semilla in (("0/2", "1"), ("1/2", "2")):
+        ruta = directorio / f"semilla_{semilla}.csv"
+        ejecutar("--entrada", entrada, "--salida", ruta, "--shard", shard, "--semilla", semilla)
+        rutas.append(str(ruta))
+
+    with pytest.raises(ValueError, match="parámetros distintos"):
+        generador.main(["merge", *rutas, "--salida", str(directorio / "semillas.csv")])
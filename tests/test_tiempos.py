@@ -0,0 +1,32 @@
+# ============================================================================
+# REGISTRO DE TIEMPOS Y PLANIFICACIÓN POR COSTE
+# ============================================================================
+
+import pandas as pd
+import pytest
+
+from utilidades import ejecutar, leer
+
+@pytest.mark.parametrize("por_bloques", [False, True])
+def test_tiempos_por_molecula(directorio, entrada, salida_completa, por_bloques):
+    ruta = directorio / f"con_tiempos_{por_bloques}.csv"
+    tiempos = directorio / f"tiempos_{por_bloques}.csv"
+    ejecutar("--entrada", entrada, "--salida", ruta, "--tiempos", tiempos,
+             *(["--por-bloques"] if por_bloques else []))
+
+    pd.testing.assert_frame_equal(leer(ruta), leer(salida_completa), check_exact=True)
+    assert len(leer(tiempos)) == 3
+
+    # Un modelo reajustado con esos tiempos sólo cambia el orden de cálculo
+    reajustada = directorio / f"reajustada_{por_bloques}.csv"
+    ejecutar("--entrada", entrada, "--salida", reajustada, "--modelo-costo", tiempos)
+    pd.testing.assert_frame_equal(leer(reajustada), leer(salida_completa), check_exact=True)
+
+@pytest.mark.parametrize("argumentos", [
+    ["--tiempos", "tiempos.xlsx"],
+    ["--tiempos", "salida.csv", "--salida", "salida.csv"],
+])
+def test_tiempos_no_validos_fallan_antes_de_calcular(directorio, entrada, argumentos, monkeypatch):
+    monkeypatch.chdir(directorio)
+    with pytest.raises(ValueError):
+        ejecutar("--entrada", entrada, *argumentos)
@@ -0,0 +1,15 @@
+# ============================================================================
+# UTILIDADES COMPARTIDAS POR LAS EJECUCIONES DE LA LÍNEA DE COMANDOS
+# ============================================================================
+
+import pandas as pd
+
+import molecular_descriptor_generator as generador
+
+MOLECULAS = "CCO etanol\nc1ccccc1O fenol\nC1CC roto\n"
+
+def ejecutar(*argumentos):
+    generador.main(["--workers", "1", "--iteraciones", "2", *map(str, argumentos)])
+
+def leer(ruta):
+    return pd.read_csv(ruta, float_precision="round_trip")